@@ -2,6 +2,8 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from cart.guest import token_from, merge_guest_cart
 from sellers.models import SellerProfile  # make sure this import exists
 
 User = get_user_model()
@@ -49,3 +51,17 @@ class RegisterSellerSerializer(BaseRegisterSerializer):
         user = self.create_user(validated_data, User.Roles.SELLER)
         SellerProfile.objects.create(user=user, shop_name=shop_name)
         return user
+
+
+class LoginSerializer(TokenObtainPairSerializer):
+    """JWT login that also folds the shopper's guest cart (X-Guest-Cart) into their cart."""
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        request = self.context.get("request")
+        if request is not None:
+            try:
+                merge_guest_cart(self.user, token_from(request))
+            except Exception:
+                # login must not fail because of the guest cart
+                pass
+        return data
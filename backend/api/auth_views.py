@@ -2,24 +2,38 @@ from rest_framework import permissions, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth import get_user_model
-from .auth_serializers import RegisterCustomerSerializer, RegisterSellerSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .auth_serializers import RegisterCustomerSerializer, RegisterSellerSerializer, LoginSerializer
+from .throttles import AuthThrottleMixin, auth_metrics
 
 User = get_user_model()
 
-class RegisterCustomerView(generics.CreateAPIView):
+class LoginView(AuthThrottleMixin, TokenObtainPairView):
+    serializer_class = LoginSerializer
+    metrics_name = "login"
+
+class RegisterCustomerView(AuthThrottleMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterCustomerSerializer
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
+    metrics_name = "register_customer"
 
-class RegisterSellerView(generics.CreateAPIView):
+class RegisterSellerView(AuthThrottleMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSellerSerializer
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
+    metrics_name = "register_seller"
 
 class MeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     def get(self, request):
         u = request.user
         return Response({"id": u.id, "username": u.username, "email": u.email, "role": u.role})
+
+# GET /api/auth/metrics/  -> hashed vs throttled attempts (per worker process unless the default cache is Redis)
+class AuthMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+    def get(self, request):
+        return Response(auth_metrics(["login", "register_customer", "register_seller"]))
@@ -0,0 +1,38 @@
+from django.utils.dateparse import parse_date
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from orders.exports import order_records, order_csv_rows, ORDER_CSV_COLUMNS
+from orders.models import Order
+from payments.exports import payment_records, PAYMENT_COLUMNS
+from payments.models import Payment
+from .exports import export_response
+
+
+def _filter(qs, request):
+    # ?status=A,B  ?since=YYYY-MM-DD
+    status_param = request.query_params.get("status")
+    if status_param:
+        qs = qs.filter(status__in=[s.strip() for s in status_param.split(",") if s.strip()])
+    since = parse_date(request.query_params.get("since") or "")
+    if since:
+        qs = qs.filter(created_at__date__gte=since)
+    return qs
+
+
+# GET /api/exports/orders/?fmt=csv|jsonl&gzip=1&status=PAID&since=2025-01-01
+class ExportOrdersView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        qs = _filter(Order.objects.all(), request)
+        return export_response(request, "orders", order_records(qs), ORDER_CSV_COLUMNS, flatten=order_csv_rows)
+
+
+# GET /api/exports/payments/?fmt=csv|jsonl&gzip=1&status=captured
+class ExportPaymentsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        qs = _filter(Payment.objects.all(), request)
+        return export_response(request, "payments", payment_records(qs), PAYMENT_COLUMNS)
@@ -0,0 +1,40 @@
+"""Shared bits for the startup commands: run a cold web-process start in a fresh interpreter."""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Runs in the child: setup + WSGI app + first GET, timing each phase.
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.conf import settings
+from wsgiref.util import setup_testing_defaults
+app = get_wsgi_application()
+t2 = time.perf_counter()
+environ = {"PATH_INFO": sys.argv[1], "REQUEST_METHOD": "GET"}
+setup_testing_defaults(environ)
+hosts = [h for h in settings.ALLOWED_HOSTS if h != "*" and not h.startswith(".")]
+environ["HTTP_HOST"] = hosts[0] if hosts else "localhost"
+status = []
+body = b"".join(app(environ, lambda s, h, exc_info=None: status.append(s)))
+t3 = time.perf_counter()
+print(json.dumps({"setup": t1 - t0, "wsgi": t2 - t1, "first_response": t3 - t2, "total": t3 - t0,
+                  "status": status[0] if status else ""}))
+"""
+
+
+def run_probe(path: str, importtime: bool = False) -> tuple[dict, str]:
+    """Returns (phase timings in seconds, -X importtime log)."""
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)}
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE, path]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=settings.BASE_DIR, env=env)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), proc.stderr
@@ -0,0 +1,49 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from api.auth_views import LoginView
+from api.throttles import auth_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a credential-stuffing burst against /api/auth/login/ from one IP and report "
+        "CPU time spent with and without the auth throttles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--attempts", type=int, default=200)
+
+    def handle(self, *args, **options):
+        attempts = options["attempts"]
+        throttles = LoginView.throttle_classes
+        try:
+            LoginView.throttle_classes = []
+            self.report("unthrottled", self.attack(attempts))
+        finally:
+            LoginView.throttle_classes = throttles
+        self.report("throttled", self.attack(attempts))
+        self.stdout.write(f"login metrics (this process): {auth_metrics(['login'])['login']}")
+
+    def attack(self, attempts):
+        client = Client(REMOTE_ADDR=f"10.{uuid.uuid4().int % 250}.0.1")
+        statuses = {}
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        for _ in range(attempts):
+            r = client.post(
+                "/api/auth/login/",
+                {"username": f"victim-{uuid.uuid4().hex[:8]}", "password": "hunter2"},
+                content_type="application/json",
+            )
+            statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+        return statuses, time.process_time() - cpu, time.perf_counter() - wall
+
+    def report(self, label, result):
+        statuses, cpu, wall = result
+        self.stdout.write(
+            f"{label:>11}: statuses {dict(sorted(statuses.items()))}, CPU {cpu:.2f}s, wall {wall:.2f}s"
+        )
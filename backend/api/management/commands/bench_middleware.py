@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+# the stock Django middleware each api.middleware.Site* class wraps
+FULL_STACK = {
+    "api.middleware.SiteSessionMiddleware": "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.SiteCsrfViewMiddleware": "django.middleware.csrf.CsrfViewMiddleware",
+    "api.middleware.SiteAuthenticationMiddleware": "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "api.middleware.SiteMessageMiddleware": "django.contrib.messages.middleware.MessageMiddleware",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request cost of the session/CSRF/auth/messages middleware on /api/: the configured "
+        "(path-aware) stack vs the stock Django stack, for /api/health/ and /api/products/, "
+        "with and without a session cookie (e.g. a logged-in admin using the site)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--paths", nargs="+", default=["/api/health/", "/api/products/"])
+        parser.add_argument("--rounds", type=int, default=3, help="Interleaved rounds; the best of each is kept")
+
+    def handle(self, *args, **opts):
+        lean = list(settings.MIDDLEWARE)
+        full = [FULL_STACK.get(m, m) for m in lean]
+        session = SessionStore()
+        session["bench"] = True
+        session.create()
+        try:
+            for path in opts["paths"]:
+                for cookie in (False, True):
+                    label = f"{path} {'(session cookie)' if cookie else ''}"
+                    results = {}
+                    for _ in range(opts["rounds"]):
+                        for name, stack in (("stock", full), ("path-aware", lean)):
+                            with override_settings(MIDDLEWARE=stack):
+                                run = self.measure(path, opts["requests"], session.session_key if cookie else None)
+                            results[name] = min(results.get(name, run), run)
+                    (s_us, s_q), (l_us, l_q) = results["stock"], results["path-aware"]
+                    self.stdout.write(
+                        f"{label:<40} stock {s_us:7.1f}us {s_q} queries | path-aware {l_us:7.1f}us {l_q} queries | "
+                        f"saved {s_us - l_us:6.1f}us/request ({100 * (s_us - l_us) / s_us:4.1f}%)"
+                    )
+        finally:
+            session.delete()
+
+    def measure(self, path, n, session_key):
+        client = Client()
+        if session_key:
+            client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+        client.get(path)  # warm up: middleware chain, url resolver, caches
+        with CaptureQueriesContext(connection) as queries:
+            client.get(path)
+        started = time.perf_counter()
+        for _ in range(n):
+            client.get(path)
+        return (time.perf_counter() - started) / n * 1e6, len(queries)
@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from cart.fastpath import cart_data
+from cart.models import Cart
+from cart.serializers import CartSerializer
+from orders.fastpath import order_rows
+from orders.models import Order
+from orders.serializers import OrderSerializer
+from store.fastpath import product_rows
+from store.serializers import ProductSerializer
+from store.views_api import ProductViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Parity check for the fast list serializers + orjson renderer: renders products, orders and carts "
+        "from the current database both ways, fails on any byte difference, and prints timings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Users/carts to sample for orders and carts")
+
+    def handle(self, *args, **options):
+        self.slow, self.fast = JSONRenderer(), FastJSONRenderer()
+        self.failures = 0
+
+        products = ProductViewSet.queryset.all()
+        self.compare("products", lambda: ProductSerializer(products, many=True).data, lambda: product_rows(products))
+
+        user_ids = Order.objects.order_by("user_id").values_list("user_id", flat=True).distinct()[:options["limit"]]
+        for uid in user_ids:
+            orders = Order.objects.filter(user_id=uid).prefetch_related("items")
+            self.compare(f"orders user={uid}", lambda: OrderSerializer(orders, many=True).data, lambda: order_rows(orders))
+
+        for cart in Cart.objects.filter(items__isnull=False).distinct()[:options["limit"]]:
+            self.compare(f"cart id={cart.id}", lambda: CartSerializer(cart).data, lambda: cart_data(cart))
+
+        if self.failures:
+            raise CommandError(f"{self.failures} payload(s) differ between the fast path and the serializers.")
+        self.stdout.write(self.style.SUCCESS("Fast path output is byte-identical."))
+
+    def compare(self, label, slow_data, fast_data):
+        t0 = time.perf_counter()
+        expected = self.slow.render(slow_data())
+        t1 = time.perf_counter()
+        got = self.fast.render(fast_data())
+        t2 = time.perf_counter()
+
+        if got != expected:
+            self.failures += 1
+            at = next((i for i, (a, b) in enumerate(zip(got, expected)) if a != b), min(len(got), len(expected)))
+            self.stdout.write(self.style.ERROR(
+                f"{label}: MISMATCH at byte {at}: fast={got[at:at + 60]!r} serializer={expected[at:at + 60]!r}"
+            ))
+        else:
+            self.stdout.write(
+                f"{label}: ok ({len(got)} bytes, serializer {1000 * (t1 - t0):.1f}ms, fast {1000 * (t2 - t1):.1f}ms)"
+            )
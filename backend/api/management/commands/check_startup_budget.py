@@ -0,0 +1,36 @@
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ._startup import run_probe
+
+
+class Command(BaseCommand):
+    help = (
+        "Fail (non-zero exit) when a cold web process takes longer than STARTUP_BUDGET_MS from "
+        "interpreter start to its first /api/health/ response. Median of --runs fresh interpreters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/health/")
+        parser.add_argument("--runs", type=int, default=3)
+        parser.add_argument("--budget-ms", dest="budget_ms", type=int, default=None)
+
+    def handle(self, *args, **opts):
+        budget = opts["budget_ms"] or settings.STARTUP_BUDGET_MS
+        runs = [run_probe(opts["path"])[0] for _ in range(max(opts["runs"], 1))]
+        bad = [r["status"] for r in runs if not r["status"].startswith("200")]
+        if bad:
+            raise CommandError(f"{opts['path']} answered {bad[0]!r} on a cold start.")
+
+        total = statistics.median(r["total"] for r in runs) * 1000
+        phases = {k: statistics.median(r[k] for r in runs) * 1000 for k in ("setup", "wsgi", "first_response")}
+        self.stdout.write(
+            f"cold start to first {opts['path']} response: {total:.0f}ms "
+            f"(setup {phases['setup']:.0f}, wsgi {phases['wsgi']:.0f}, first response {phases['first_response']:.0f}) "
+            f"budget {budget}ms"
+        )
+        if total > budget:
+            raise CommandError(f"Startup budget exceeded: {total:.0f}ms > {budget}ms (see `manage.py import_times`).")
+        self.stdout.write(self.style.SUCCESS("Within startup budget."))
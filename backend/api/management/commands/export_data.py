@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import encode
+from orders.exports import order_records, order_csv_rows, ORDER_CSV_COLUMNS
+from orders.models import Order
+from payments.exports import payment_records, PAYMENT_COLUMNS
+from payments.models import Payment
+from store.exports import product_records, PRODUCT_COLUMNS
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Stream orders (with items), payments or products to CSV/JSON Lines, optionally gzipped. Constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=["orders", "payments", "products"])
+        parser.add_argument("--format", dest="fmt", choices=["csv", "jsonl"], default="csv")
+        parser.add_argument("--gzip", action="store_true")
+        parser.add_argument("--output", "-o", help="file path (default: stdout)")
+        parser.add_argument("--seller", help="products only: limit to this seller's username")
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        dataset, batch_size = options["dataset"], options["batch_size"]
+        flatten = None
+        if dataset == "orders":
+            records, columns, flatten = order_records(Order.objects.all(), batch_size), ORDER_CSV_COLUMNS, order_csv_rows
+        elif dataset == "payments":
+            records, columns = payment_records(Payment.objects.all(), batch_size), PAYMENT_COLUMNS
+        else:
+            qs = Product.objects.all()
+            if options["seller"]:
+                qs = qs.filter(owner__username=options["seller"])
+            records, columns = product_records(qs, batch_size), PRODUCT_COLUMNS
+
+        chunks = encode(records, options["fmt"], columns, flatten, options["gzip"])
+        if options["output"]:
+            with open(options["output"], "wb") as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Wrote {dataset} to {options['output']}"))
+            return
+        if options["gzip"] and sys.stdout.isatty():
+            raise CommandError("Refusing to write gzip to a terminal; use --output or redirect.")
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
@@ -0,0 +1,43 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from ._startup import run_probe
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold-start a web process in a fresh interpreter (python -X importtime) and report where "
+        "import time goes: per top-level package and the slowest modules imported directly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/health/", help="URL requested after startup")
+        parser.add_argument("--top", type=int, default=20)
+
+    def handle(self, *args, **opts):
+        timings, log = run_probe(opts["path"], importtime=True)
+
+        per_package = defaultdict(int)  # self time, microseconds
+        roots = []                      # (cumulative, module) for modules imported at depth 0
+        for line in log.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative, name = line[len("import time:"):].split("|")
+            module = name.strip()
+            per_package[module.split(".")[0]] += int(self_us)
+            if not name[1:].startswith(" "):  # nested imports are indented
+                roots.append((int(cumulative), module))
+
+        total_us = sum(per_package.values())
+        self.stdout.write(
+            f"setup {timings['setup'] * 1000:.0f}ms, wsgi {timings['wsgi'] * 1000:.0f}ms, "
+            f"first response {timings['first_response'] * 1000:.0f}ms ({timings['status']}), "
+            f"imports {total_us / 1000:.0f}ms"
+        )
+        self.stdout.write("\nby package (self time):")
+        for pkg, us in sorted(per_package.items(), key=lambda kv: -kv[1])[:opts["top"]]:
+            self.stdout.write(f"  {us / 1000:8.1f}ms  {pkg}")
+        self.stdout.write("\nslowest top-level imports (cumulative):")
+        for us, module in sorted(roots, reverse=True)[:opts["top"]]:
+            self.stdout.write(f"  {us / 1000:8.1f}ms  {module}")
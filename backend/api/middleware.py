@@ -0,0 +1,231 @@
+import hashlib
+import os
+import re
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+from django.middleware.csrf import CsrfViewMiddleware
+from whitenoise.responders import MissingFileError
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from store.catalog import catalog_version
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip only without it
+    brotli = None
+
+
+def _accepted_encodings(request) -> set[str]:
+    accepted = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _compress(body: bytes, encoding: str, random_bytes=None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.API_BROTLI_QUALITY)
+    return compress_string(body, max_random_bytes=random_bytes)
+
+
+class ApiCompressionMiddleware:
+    """
+    Negotiated brotli/gzip for /api/ responses over API_COMPRESS_MIN_BYTES.
+
+    Catalog views mark their responses `cache_catalog`; for anonymous GETs those are
+    stored in the cache together with their compressed variants, so a hot hit skips
+    the view, the renderer and the compressor.
+    """
+
+    # BREACH mitigation for per-user responses (same as Django's GZipMiddleware)
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith("/api/"):
+            return self.get_response(request)
+
+        encoding = self.negotiate(request)
+        key = self.catalog_key(request)
+        if key:
+            entry = cache.get(key)
+            if entry is not None:
+                return self.from_entry(entry, encoding)
+
+        response = self.get_response(request)
+
+        if key and getattr(response, "cache_catalog", False) and response.status_code == 200 \
+                and not response.streaming and not response.has_header("Set-Cookie"):
+            entry = self.build_entry(response)
+            cache.set(key, entry, settings.CATALOG_CACHE_TTL)
+            return self.from_entry(entry, encoding)
+
+        return self.compress_response(response, encoding)
+
+    def negotiate(self, request):
+        accepted = _accepted_encodings(request)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def catalog_key(self, request):
+        if request.method not in ("GET", "HEAD") or "HTTP_AUTHORIZATION" in request.META:
+            return None
+        if not request.path.startswith(settings.CATALOG_CACHE_PREFIXES):
+            return None
+        raw = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+        return f"api:catalog:{catalog_version()}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def build_entry(self, response):
+        body = response.content
+        entry = {
+            "status": response.status_code,
+            "headers": [(k, v) for k, v in response.items() if k.lower() != "content-length"],
+            "identity": body,
+        }
+        if len(body) >= settings.API_COMPRESS_MIN_BYTES:
+            entry["gzip"] = _compress(body, "gzip")
+            if brotli is not None:
+                entry["br"] = _compress(body, "br")
+        return entry
+
+    def from_entry(self, entry, encoding):
+        body = entry.get(encoding) if encoding else None
+        response = HttpResponse(body or entry["identity"], status=entry["status"])
+        for k, v in entry["headers"]:
+            response[k] = v
+        if body:
+            response["Content-Encoding"] = encoding
+        response["Content-Length"] = str(len(response.content))
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    def compress_response(self, response, encoding):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < settings.API_COMPRESS_MIN_BYTES:
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not encoding:
+            return response
+        compressed = _compress(response.content, encoding, self.max_random_bytes)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+
+class RuntimeWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise indexes STATIC_ROOT once at startup, but catalog snapshots
+    (store.snapshots) and product image variants (store.images) are written later
+    by a worker. Look those up on disk on request; content-hashed ones are remembered
+    and served as immutable, anything else is re-read each time.
+    """
+
+    hashed_name = re.compile(r"(^|[/.])[0-9a-f]{12,}[.-][^/]*$")
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        media_url = urlparse(settings.MEDIA_URL or "").path
+        self.runtime_dirs = [
+            (f"{self.static_prefix}{settings.CATALOG_SNAPSHOT_DIR}/", os.path.join(settings.STATIC_ROOT, settings.CATALOG_SNAPSHOT_DIR)),
+            (f"{media_url.rstrip('/')}/products/", os.path.join(settings.MEDIA_ROOT, "products")),
+        ]
+        if self.autorefresh:
+            # dev: WhiteNoise already stats per request, it just needs to know the directories
+            for prefix, root in self.runtime_dirs:
+                self.directories.insert(0, (root.rstrip(os.path.sep) + os.path.sep, prefix))
+
+    def __call__(self, request):
+        if self.autorefresh:
+            return super().__call__(request)
+        path = request.path_info
+        static_file = self.files.get(path)
+        if static_file is None and self.url_is_canonical(path):
+            static_file = self.runtime_file(path)
+        if static_file is not None:
+            try:
+                return self.serve(static_file, request)
+            except FileNotFoundError:
+                # pruned since it was remembered (old snapshot generation): forget it, 404 below
+                self.files.pop(path, None)
+        return self.get_response(request)
+
+    def runtime_file(self, path):
+        for prefix, root in self.runtime_dirs:
+            if path.startswith(prefix):
+                try:
+                    static_file = self.get_static_file(os.path.join(root, path[len(prefix):]), path)
+                except MissingFileError:
+                    return None
+                # only content-hashed names are remembered; manifest.json is rewritten in place,
+                # so its size/ETag headers are rebuilt on every request
+                if self.hashed_name.search(path):
+                    self.files[path] = static_file
+                return static_file
+        return None
+
+    def immutable_file_test(self, path, url):
+        # (also called while the base class indexes STATIC_ROOT, before runtime_dirs exists)
+        runtime_dirs = getattr(self, "runtime_dirs", ())
+        if any(url.startswith(prefix) for prefix, _ in runtime_dirs) and self.hashed_name.search(url):
+            return True
+        return super().immutable_file_test(path, url)
+
+
+# --- session-backed middleware, skipped for the JWT-only API ---
+API_PREFIX = "/api/"
+
+
+class SkipForApiMixin:
+    """
+    /api/ authenticates per view with simplejwt and never touches sessions, CSRF cookies
+    or messages, so these only run for the rest of the site (admin). DRF's APIView is
+    csrf-exempt already; the CSRF check only mattered for session-authenticated views.
+    """
+    def __call__(self, request):
+        if request.path_info.startswith(API_PREFIX):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SiteSessionMiddleware(SkipForApiMixin, SessionMiddleware):
+    pass
+
+
+class SiteCsrfViewMiddleware(SkipForApiMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # process_view is called by the handler directly, not through __call__
+        if request.path_info.startswith(API_PREFIX):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class SiteAuthenticationMiddleware(SkipForApiMixin, AuthenticationMiddleware):
+    pass
+
+
+class SiteMessageMiddleware(SkipForApiMixin, MessageMiddleware):
+    pass
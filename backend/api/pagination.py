@@ -0,0 +1,119 @@
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .counting import cached_count
+
+
+class CountedCursorPagination(CursorPagination):
+    """
+    Keyset pagination that also reports the listing's size. Counts come from
+    api.counting.cached_count: exact for small listings, planner estimates above
+    ESTIMATED_COUNT_THRESHOLD ("count_approximate": true), cached per filter signature.
+
+    The cursor carries the last row's value for every ordering field, so pages are
+    `(a, id) < (last_a, last_id)` range reads however many rows tie on `a`. (DRF's
+    CursorPagination positions on the first field only and skips ties with an offset,
+    which breaks once more than offset_cutoff rows share a value.) The ordering must
+    end with a unique field; `id` is appended if it doesn't.
+
+    Opt-in: without ?cursor= or ?page_size= the view keeps returning the plain array
+    existing clients expect.
+    """
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        self.count, self.count_approximate = cached_count(queryset)
+
+        page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.request = request
+        ordering = list(self.get_ordering(request, queryset, view))
+        if ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        self.ordering = ordering
+        fields = {f.name: f for f in queryset.model._meta.concrete_fields}
+        self.fields = [fields["id" if o.lstrip("-") == "pk" else o.lstrip("-")] for o in ordering]
+
+        position, reverse = self.decode_keyset(request)
+        if reverse:
+            queryset = queryset.order_by(*[o[1:] if o.startswith("-") else "-" + o for o in ordering])
+        else:
+            queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, reverse))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = rows
+        return rows
+
+    def after(self, position, reverse: bool) -> Q:
+        """Rows strictly after `position` in the (possibly reversed) ordering."""
+        condition = Q()
+        for i, (order, field) in enumerate(zip(self.ordering, self.fields)):
+            descending = order.startswith("-") != reverse
+            step = Q(**{f"{field.name}__{'lt' if descending else 'gt'}": position[i]})
+            for prior, value in zip(self.fields[:i], position[:i]):
+                step &= Q(**{prior.name: value})
+            condition |= step
+        return condition
+
+    def key(self, row) -> list:
+        values = [row[f.name] if isinstance(row, dict) else getattr(row, f.attname) for f in self.fields]
+        return [v.isoformat() if isinstance(v, datetime) else v for v in values]
+
+    def decode_keyset(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = data["v"], bool(data.get("r"))
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [f.to_python(v) for f, v in zip(self.fields, values)], reverse
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def keyset_link(self, row, reverse: bool) -> str:
+        data = {"v": self.key(row), "r": 1} if reverse else {"v": self.key(row)}
+        token = base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        return self.keyset_link(self.page[-1], False) if self.has_next and self.page else None
+
+    def get_previous_link(self):
+        return self.keyset_link(self.page[0], True) if self.has_previous and self.page else None
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "count": self.count,
+            "count_approximate": self.count_approximate,
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count"] = {"type": "integer", "example": 123}
+        schema["properties"]["count_approximate"] = {"type": "boolean"}
+        return schema
@@ -1,3 +1,45 @@
-from django.test import TestCase
+import statistics
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .management.commands._startup import run_probe
+from .throttles import AuthIPThrottle
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class AuthIPThrottleTests(TestCase):
+    """Rotating X-Forwarded-For (and usernames) must not buy a fresh per-IP budget."""
+
+    def setUp(self):
+        cache.clear()
+        self.budget = AuthIPThrottle().num_requests
+
+    def login(self, i, **headers):
+        return self.client.post("/api/auth/login/", {"username": f"nobody{i}", "password": "x"},
+                                content_type="application/json", **headers)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1})
+    def test_spoofed_forwarded_for_shares_the_proxy_hop_bucket(self):
+        for i in range(self.budget):
+            # the client-supplied entries vary; the address our proxy appended doesn't
+            self.assertNotEqual(self.login(i, HTTP_X_FORWARDED_FOR=f"203.0.113.{i}, 198.51.100.7").status_code, 429)
+        self.assertEqual(self.login(99, HTTP_X_FORWARDED_FOR="203.0.113.250, 198.51.100.7").status_code, 429)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 0})
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        for i in range(self.budget):
+            self.assertNotEqual(self.login(i, HTTP_X_FORWARDED_FOR=f"203.0.113.{i}").status_code, 429)
+        self.assertEqual(self.login(99, HTTP_X_FORWARDED_FOR="192.0.2.1").status_code, 429)
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """A cold web process (fresh interpreter -> first /api/health/ response) must fit STARTUP_BUDGET_MS."""
+
+    def test_cold_start_within_budget(self):
+        runs = [run_probe("/api/health/")[0] for _ in range(3)]
+        self.assertTrue(all(r["status"].startswith("200") for r in runs), [r["status"] for r in runs])
+        median_ms = statistics.median(r["total"] for r in runs) * 1000
+        self.assertLessEqual(median_ms, settings.STARTUP_BUDGET_MS,
+                             f"cold start took {median_ms:.0f}ms; see `manage.py import_times`")
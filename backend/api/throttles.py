@@ -0,0 +1,66 @@
+import hashlib
+import logging
+
+from django.core.cache import cache
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "auth:metrics:{view}:{outcome}"
+
+
+class AuthIPThrottle(SimpleRateThrottle):
+    """Per-client-IP budget for endpoints that hash passwords."""
+    scope = "auth_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class AuthUsernameThrottle(SimpleRateThrottle):
+    """Per-username budget, so one account can't be hammered from many IPs."""
+    scope = "auth_username"
+
+    def get_cache_key(self, request, view):
+        data = request.data if hasattr(request.data, "get") else {}
+        username = str(data.get("username") or "").strip().lower()
+        if not username:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": hashlib.sha1(username.encode()).hexdigest()}
+
+
+def _count(view_name: str, outcome: str) -> None:
+    key = METRICS_KEY.format(view=view_name, outcome=outcome)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def auth_metrics(view_names) -> dict:
+    keys = {(v, o): METRICS_KEY.format(view=v, outcome=o) for v in view_names for o in ("hashed", "rejected")}
+    values = cache.get_many(keys.values())
+    out = {v: {"hashed": 0, "rejected": 0} for v in view_names}
+    for (v, o), key in keys.items():
+        out[v][o] = values.get(key, 0)
+    return out
+
+
+class AuthThrottleMixin:
+    """
+    Throttles run in APIView.initial(), i.e. before the serializer or auth backend
+    ever hashes a password. Counts what got through (and was hashed) vs what was rejected.
+    """
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
+    metrics_name = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == "POST":
+            _count(self.metrics_name, "hashed")
+
+    def throttled(self, request, wait):
+        _count(self.metrics_name, "rejected")
+        logger.warning("auth throttled: %s from %s", self.metrics_name, request.META.get("REMOTE_ADDR"))
+        super().throttled(request, wait)
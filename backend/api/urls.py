@@ -2,16 +2,17 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from .views import health
-from .auth_views import RegisterCustomerView, RegisterSellerView, MeView
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .export_views import ExportOrdersView, ExportPaymentsView
+from .auth_views import RegisterCustomerView, RegisterSellerView, MeView, LoginView, AuthMetricsView
+from rest_framework_simplejwt.views import TokenRefreshView
 from payments.views_api import RazorpayCreateOrder, RazorpayVerify
 from payments.webhooks import RazorpayWebhook
 
 # import store viewsets
-from store.views_api import CategoryViewSet, ProductViewSet
+from store.views_api import CategoryViewSet, ProductViewSet, catalog_manifest
 from cart.views_api import CartViewSet
 from orders.views_api import OrdersViewSet
-from sellers.views_api import SellerProductViewSet
+from sellers.views_api import SellerProductViewSet, SellerOrderLineViewSet
 
 router = DefaultRouter()
 router.register("categories", CategoryViewSet, basename="category")
@@ -19,6 +20,7 @@ router.register("products",   ProductViewSet,  basename="product")
 router.register("cart",       CartViewSet,     basename="cart")
 router.register("orders", OrdersViewSet, basename="orders")
 router.register("seller/products", SellerProductViewSet, basename="seller-products")
+router.register("seller/orders", SellerOrderLineViewSet, basename="seller-orders")
 
 urlpatterns = [
     path('health/', health, name='health'),
@@ -26,13 +28,17 @@ urlpatterns = [
     # auth
     path('auth/register/customer/', RegisterCustomerView.as_view(), name='register-customer'),
     path('auth/register/seller/',   RegisterSellerView.as_view(),   name='register-seller'),
-    path('auth/login/',             TokenObtainPairView.as_view(),  name='login'),
+    path('auth/login/',             LoginView.as_view(),            name='login'),
     path('auth/token/refresh/',     TokenRefreshView.as_view(),     name='token-refresh'),
     path('auth/me/',                MeView.as_view(),               name='me'),
+    path('auth/metrics/',           AuthMetricsView.as_view(),      name='auth-metrics'),
+    path('exports/orders/',         ExportOrdersView.as_view(),     name='export-orders'),
+    path('exports/payments/',       ExportPaymentsView.as_view(),   name='export-payments'),
     path('pay/razorpay/create_order/', RazorpayCreateOrder.as_view(), name='rzp-create-order'),
     path('pay/razorpay/verify/', RazorpayVerify.as_view(), name='rzp-verify'),
     path('pay/razorpay/webhook/', RazorpayWebhook.as_view(), name='rzp-webhook'),
 
     # store api
+    path("catalog/manifest/", catalog_manifest, name="catalog-manifest"),
     path("", include(router.urls)),
 ]
@@ -1,11 +1,18 @@
 from django.contrib import admin
+from api.counting import EstimatedCountPaginator
 from .models import Cart, CartItem
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
     extra = 0
+    raw_id_fields = ("product",)
 
 @admin.register(Cart)
 class CartAdmin(admin.ModelAdmin):
-    list_display = ("user", "created_at")
+    list_display = ("user", "created_at", "updated_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    list_filter = ("updated_at",)  # fixed ranges on the (updated_at, id) index
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [CartItemInline]
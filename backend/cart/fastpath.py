@@ -0,0 +1,32 @@
+from rest_framework import serializers
+
+from .models import CartItem
+
+_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+def cart_data(cart) -> dict:
+    """CartSerializer(cart).data from a single values() query over the cart's items."""
+    price = _price.to_representation
+    items = []
+    total = 0.0
+    rows = (CartItem.objects.filter(cart=cart).order_by("id")
+            .values("id", "quantity", "product_id", "product__name", "product__slug",
+                    "product__price", "product__image_url"))
+    for r in rows:
+        subtotal = float(r["product__price"]) * int(r["quantity"])
+        total += subtotal
+        items.append({
+            "id": r["id"],
+            "product": {
+                "id": r["product_id"],
+                "name": r["product__name"],
+                "slug": r["product__slug"],
+                "price": price(r["product__price"]),
+                "image_url": r["product__image_url"],
+            },
+            "quantity": r["quantity"],
+            "subtotal": subtotal,
+        })
+    return {"id": cart.id, "created_at": _datetime.to_representation(cart.created_at), "items": items, "total": total}
@@ -0,0 +1,112 @@
+"""
+Guest carts: {product_id: quantity} kept in the GUEST_CART_CACHE cache under a signed
+token (X-Guest-Cart header). Nothing touches the database until the shopper logs in,
+when merge_guest_cart() folds the lines into their Cart with one bulk upsert.
+
+prod points that cache at Redis when REDIS_URL is set; without it each worker has its
+own local cache and a guest cart only lives in the worker that wrote it.
+"""
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import serializers
+
+from store.inventory import stock_levels
+from store.models import Product
+from .models import Cart, CartItem
+
+HEADER = "X-Guest-Cart"
+_SALT = "cart.guest"
+_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class CartFull(ValueError):
+    pass
+
+
+def new_token() -> str:
+    return signing.dumps(uuid.uuid4().hex, salt=_SALT)
+
+
+def _key(token: str | None) -> str | None:
+    if not token:
+        return None
+    try:
+        return "cart:guest:" + signing.loads(token, salt=_SALT)
+    except signing.BadSignature:
+        return None
+
+
+def token_from(request) -> str | None:
+    token = request.headers.get(HEADER)
+    return token if _key(token) else None
+
+
+def load(token: str | None) -> dict[int, int]:
+    key = _key(token)
+    return caches[settings.GUEST_CART_CACHE].get(key, {}) if key else {}
+
+
+def save(token: str, items: dict[int, int]) -> None:
+    if len(items) > settings.GUEST_CART_MAX_ITEMS:
+        raise CartFull(f"Cart is limited to {settings.GUEST_CART_MAX_ITEMS} products.")
+    caches[settings.GUEST_CART_CACHE].set(_key(token), items, settings.GUEST_CART_TTL)
+
+
+def discard(token: str | None) -> None:
+    key = _key(token)
+    if key:
+        caches[settings.GUEST_CART_CACHE].delete(key)
+
+
+def guest_cart_data(token: str, items: dict[int, int]) -> dict:
+    """Same shape as CartSerializer; item ids are product ids since guest lines have no rows."""
+    price = _price.to_representation
+    rows = {
+        r["id"]: r for r in Product.objects.filter(id__in=list(items), is_active=True)
+        .values("id", "name", "slug", "price", "image_url")
+    }
+    out, total = [], 0.0
+    for product_id, qty in items.items():
+        r = rows.get(product_id)
+        if r is None:
+            continue
+        subtotal = float(r["price"]) * int(qty)
+        total += subtotal
+        out.append({
+            "id": product_id,
+            "product": {**r, "price": price(r["price"])},
+            "quantity": qty,
+            "subtotal": subtotal,
+        })
+    return {"id": None, "created_at": None, "items": out, "total": total, "guest_token": token}
+
+
+def merge_guest_cart(user, token: str | None) -> int:
+    """
+    Add the guest cart's quantities onto the user's cart (capped at available stock),
+    then drop the guest cart. One read of existing lines + one INSERT ... ON CONFLICT UPDATE.
+    """
+    items = load(token)
+    if not items:
+        return 0
+    products = list(Product.objects.filter(id__in=list(items), is_active=True).values("id", "stock", "sharded_stock"))
+    stock = stock_levels(products)
+
+    with transaction.atomic():
+        cart, _ = Cart.objects.get_or_create(user=user)
+        existing = dict(CartItem.objects.filter(cart=cart, product_id__in=list(stock)).values_list("product_id", "quantity"))
+        lines = []
+        for product_id, available in stock.items():
+            qty = min(existing.get(product_id, 0) + items[product_id], available or 0)
+            if qty > 0:
+                lines.append(CartItem(cart=cart, product_id=product_id, quantity=qty))
+        CartItem.objects.bulk_create(
+            lines, update_conflicts=True, unique_fields=["cart", "product"], update_fields=["quantity"],
+        )
+        cart.touch()
+    discard(token)
+    return len(lines)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from cart.services import purge_stale_carts
+
+
+class Command(BaseCommand):
+    help = "Delete carts and cart items not touched for --days (keyset-batched, short transactions)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.CART_STALE_DAYS)
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=settings.CART_PURGE_BATCH_SIZE)
+        parser.add_argument("--dry-run", dest="dry_run", action="store_true", help="Only count what would be deleted")
+
+    def handle(self, *args, **options):
+        report = purge_stale_carts(options["days"], options["batch_size"], options["dry_run"])
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['carts']} carts / {report['items']} items "
+            f"untouched since {report['cutoff']} ({report['batches']} batches)."
+        ))
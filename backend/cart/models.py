@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from store.models import Product
 
 class Cart(models.Model):
@@ -7,10 +8,17 @@ class Cart(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="cart"
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # bumped on every cart write; drives stale-cart purge
+
+    class Meta:
+        indexes = [models.Index(fields=["updated_at", "id"])]
 
     def __str__(self):
         return f"Cart<{self.user.username}>"
 
+    def touch(self):
+        Cart.objects.filter(pk=self.pk).update(updated_at=timezone.now())
+
 class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="cart_items")
@@ -18,6 +26,7 @@ class CartItem(models.Model):
 
     class Meta:
         unique_together = (("cart", "product"),)
+        ordering = ["id"]
 
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
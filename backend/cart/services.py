@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+
+def purge_stale_carts(days: int | None = None, batch_size: int | None = None, dry_run: bool = False) -> dict:
+    """
+    Delete carts (and their items) untouched for `days`, walking the
+    (updated_at, id) index in keyset batches so each delete is a short transaction
+    and each batch is an index range scan, not a re-sort of the whole stale set.
+    """
+    days = settings.CART_STALE_DAYS if days is None else days
+    batch_size = batch_size or settings.CART_PURGE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    report = {"cutoff": cutoff.isoformat(), "carts": 0, "items": 0, "batches": 0}
+    last = None
+    while True:
+        qs = Cart.objects.filter(updated_at__lt=cutoff)
+        if last is not None:
+            qs = qs.filter(Q(updated_at__gt=last[0]) | Q(updated_at=last[0], id__gt=last[1]))
+        rows = list(qs.order_by("updated_at", "id").values_list("updated_at", "id")[:batch_size])
+        if not rows:
+            break
+        last = rows[-1]
+        ids = [pk for _, pk in rows]
+        report["batches"] += 1
+        if dry_run:
+            report["carts"] += len(ids)
+            report["items"] += CartItem.objects.filter(cart_id__in=ids).count()
+            continue
+        with transaction.atomic():
+            # re-check the cutoff so a cart touched since the scan survives; items go via fast cascade
+            _, per_model = Cart.objects.filter(id__in=ids, updated_at__lt=cutoff).delete()
+        report["carts"] += per_model.get(Cart._meta.label, 0)
+        report["items"] += per_model.get(CartItem._meta.label, 0)
+    return report
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .services import purge_stale_carts
+
+
+@shared_task
+def purge_stale_carts_task():
+    return purge_stale_carts()
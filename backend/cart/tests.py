@@ -1,3 +1,85 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.renderers import FastJSONRenderer
+from store.models import Category, Product
+from .fastpath import cart_data
+from .guest import HEADER
+from .models import Cart, CartItem
+from .serializers import CartSerializer
+
+
+class FastCartDataTests(TestCase):
+    """cart.fastpath must render byte-for-byte what CartSerializer + JSONRenderer do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username="shopper", password="x")
+        category = Category.objects.create(name="Toys")
+        cls.cart = Cart.objects.create(user=user)
+        for name, price, qty in (("Kite", "12.00", 1), ("Puzzle", "7.49", 3), ("Yo-yo", "0.99", 10)):
+            product = Product.objects.create(category=category, name=name, price=Decimal(price), stock=20)
+            CartItem.objects.create(cart=cls.cart, product=product, quantity=qty)
+
+    def test_cart_is_byte_identical(self):
+        expected = JSONRenderer().render(CartSerializer(self.cart).data)
+        self.assertEqual(FastJSONRenderer().render(cart_data(self.cart)), expected)
+
+    def test_empty_cart(self):
+        cart = Cart.objects.create(user=get_user_model().objects.create_user(username="empty", password="x"))
+        self.assertEqual(FastJSONRenderer().render(cart_data(cart)), JSONRenderer().render(CartSerializer(cart).data))
+
+
+class GuestCartTests(TestCase):
+    """Anonymous carts live in GUEST_CART_CACHE; the database is only written when they're merged."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Toys")
+        cls.kite = Product.objects.create(category=category, name="Kite", price=Decimal("12.00"), stock=5)
+        cls.puzzle = Product.objects.create(category=category, name="Puzzle", price=Decimal("7.49"), stock=5)
+
+    def setUp(self):
+        caches[settings.GUEST_CART_CACHE].clear()
+        self.client = APIClient()
+
+    def add(self, product, quantity=1, token=None):
+        headers = {HEADER: token} if token else {}
+        return self.client.post("/api/cart/add/", {"product_id": product.id, "quantity": quantity},
+                                format="json", headers=headers)
+
+    def test_guest_cart_writes_nothing_to_the_database(self):
+        with CaptureQueriesContext(connection) as queries:
+            token = self.add(self.kite).json()["guest_token"]
+            self.add(self.puzzle, 2, token)
+            self.client.patch("/api/cart/update_item/", {"product_id": self.kite.id, "quantity": 3},
+                              format="json", headers={HEADER: token})
+            self.client.delete(f"/api/cart/remove/?product_id={self.puzzle.id}", headers={HEADER: token})
+            cart = self.client.get("/api/cart/", headers={HEADER: token}).json()
+        writes = [q["sql"] for q in queries if not q["sql"].lstrip().upper().startswith(("SELECT", "SAVEPOINT", "RELEASE"))]
+        self.assertEqual(writes, [])
+        self.assertEqual([(i["id"], i["quantity"]) for i in cart["items"]], [(self.kite.id, 3)])
+
+    @override_settings(GUEST_CART_MAX_ITEMS=1)
+    def test_size_cap(self):
+        token = self.add(self.kite).json()["guest_token"]
+        self.assertEqual(self.add(self.puzzle, token=token).status_code, 400)
+
+    def test_merge_on_login(self):
+        token = self.add(self.kite, 2).json()["guest_token"]
+        user = get_user_model().objects.create_user(username="guest", password="x")
+        self.client.force_authenticate(user)
+        self.client.post("/api/cart/merge/", headers={HEADER: token})
+        self.assertEqual(list(CartItem.objects.filter(cart__user=user).values_list("product_id", "quantity")),
+                         [(self.kite.id, 2)])
+        self.assertEqual(self.client.get("/api/cart/", headers={HEADER: token}).json()["items"][0]["quantity"], 2)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/cart/", headers={HEADER: token}).json()["items"], [])
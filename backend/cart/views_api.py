@@ -1,21 +1,41 @@
+from django.conf import settings
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db import transaction
+from store.inventory import available_stock
 from .models import Cart, CartItem
 from .serializers import CartSerializer, CartItemWriteSerializer
+from .fastpath import cart_data
+from .guest import CartFull, token_from, new_token, load, save, discard, guest_cart_data, merge_guest_cart
 
+EMPTY_CART = {"id": None, "created_at": None, "items": [], "total": 0.0}
+
+# Anonymous shoppers get a guest cart: kept in the cache under the signed X-Guest-Cart token
+# (returned as "guest_token"), no database writes until login merges it (cart.guest).
 class CartViewSet(viewsets.GenericViewSet):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.AllowAny]
     serializer_class = CartSerializer
 
     def get_cart(self, request):
         cart, _ = Cart.objects.get_or_create(user=request.user)
         return cart
 
+    def guest_response(self, token, items, status_code=200):
+        if not token:
+            return Response(EMPTY_CART, status=status_code)
+        return Response(guest_cart_data(token, items), status=status_code)
+
     # GET /api/cart/
     def list(self, request):
-        cart = self.get_cart(request)
+        if not request.user.is_authenticated:
+            token = token_from(request)
+            return self.guest_response(token, load(token))
+        cart = Cart.objects.filter(user=request.user).first()  # reading doesn't create a cart row
+        if cart is None:
+            return Response(EMPTY_CART)
+        if settings.FAST_SERIALIZERS:
+            return Response(cart_data(cart))
         data = CartSerializer(cart, context={"request": request}).data
         return Response(data)
 
@@ -29,20 +49,35 @@ class CartViewSet(viewsets.GenericViewSet):
         qty = ser.validated_data["quantity"]
 
         # stock check
-        if product.stock is not None and qty > product.stock:
+        stock = available_stock(product)
+        if qty > stock:
             return Response({"detail": "Not enough stock."}, status=400)
 
+        if not request.user.is_authenticated:
+            token = token_from(request) or new_token()
+            items = load(token)
+            new_qty = items.get(product.id, 0) + qty
+            if new_qty > stock:
+                return Response({"detail": "Not enough stock."}, status=400)
+            items[product.id] = new_qty
+            try:
+                save(token, items)
+            except CartFull as e:
+                return Response({"detail": str(e)}, status=400)
+            return self.guest_response(token, items, status.HTTP_201_CREATED)
+
         cart = self.get_cart(request)
         item, created = CartItem.objects.select_for_update().get_or_create(
             cart=cart, product=product, defaults={"quantity": qty}
         )
         if not created:
             new_qty = item.quantity + qty
-            if product.stock is not None and new_qty > product.stock:
+            if new_qty > stock:
                 return Response({"detail": "Not enough stock."}, status=400)
             item.quantity = new_qty
             item.save(update_fields=["quantity"])
 
+        cart.touch()
         return Response(CartSerializer(cart).data, status=status.HTTP_201_CREATED)
 
     # PATCH /api/cart/update/
@@ -54,17 +89,29 @@ class CartViewSet(viewsets.GenericViewSet):
         product = ser.validated_data["product"]
         qty = ser.validated_data["quantity"]
 
+        if not request.user.is_authenticated:
+            token = token_from(request)
+            items = load(token)
+            if product.id not in items:
+                return Response({"detail": "Item not in cart."}, status=404)
+            if qty > available_stock(product):
+                return Response({"detail": "Not enough stock."}, status=400)
+            items[product.id] = qty
+            save(token, items)
+            return self.guest_response(token, items)
+
         cart = self.get_cart(request)
         try:
             item = CartItem.objects.select_for_update().get(cart=cart, product=product)
         except CartItem.DoesNotExist:
             return Response({"detail": "Item not in cart."}, status=404)
 
-        if product.stock is not None and qty > product.stock:
+        if qty > available_stock(product):
             return Response({"detail": "Not enough stock."}, status=400)
 
         item.quantity = qty
         item.save(update_fields=["quantity"])
+        cart.touch()
         return Response(CartSerializer(cart).data)
 
     # DELETE /api/cart/remove/?product_id=123
@@ -74,14 +121,31 @@ class CartViewSet(viewsets.GenericViewSet):
         product_id = request.query_params.get("product_id")
         if not product_id:
             return Response({"detail": "product_id query param required."}, status=400)
+        if not request.user.is_authenticated:
+            token = token_from(request)
+            items = load(token)
+            if product_id.isdigit() and items.pop(int(product_id), None) is not None:
+                save(token, items)
+            return self.guest_response(token, items)
         cart = self.get_cart(request)
         CartItem.objects.filter(cart=cart, product_id=product_id).delete()
+        cart.touch()
         return Response(CartSerializer(cart).data)
 
     # DELETE /api/cart/clear/
     @action(detail=False, methods=["delete"])
     @transaction.atomic
     def clear(self, request):
+        if not request.user.is_authenticated:
+            discard(token_from(request))
+            return Response(EMPTY_CART)
         cart = self.get_cart(request)
         cart.items.all().delete()
+        cart.touch()
         return Response(CartSerializer(cart).data)
+
+    # POST /api/cart/merge/  (X-Guest-Cart header) -> fold a guest cart into the user's cart; login does this too
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    def merge(self, request):
+        merge_guest_cart(request.user, token_from(request))
+        return Response(cart_data(self.get_cart(request)))
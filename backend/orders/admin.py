@@ -1,12 +1,38 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from api.counting import EstimatedCountPaginator
+from .models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+# Changelists: estimated counts, joined FKs and raw-id widgets, so nothing scales with table size.
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
+    raw_id_fields = ("product", "seller")
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ("id", "user", "status", "total", "created_at")
+    # date ranges come from the created_at list filter (fixed, index-friendly ranges); date_hierarchy
+    # would run SELECT DISTINCT date_trunc(...) over the whole table on every page load
     list_filter = ("status", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [OrderItemInline]
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+    readonly_fields = ("product", "seller", "product_name", "price", "quantity")
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "status", "total", "created_at", "archived_at")
+    list_filter = ("status", "created_at")
+    list_select_related = ("user",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = ("user", "status", "shipping_address", "total", "created_at", "archived_at")
+    inlines = [ArchivedOrderItemInline]
@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+
+def archive_orders(days: int | None = None, batch_size: int | None = None, max_batches: int | None = None) -> dict:
+    """
+    Move orders older than `days` (and their items) into the archive tables,
+    oldest first, one short transaction per batch so it can run while serving traffic.
+    """
+    days = settings.ORDER_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+
+    report = {"cutoff": cutoff.isoformat(), "orders": 0, "items": 0, "batches": 0}
+    while max_batches is None or report["batches"] < max_batches:
+        with transaction.atomic():
+            orders = list(
+                Order.objects.select_for_update()
+                .filter(created_at__lt=cutoff).order_by("created_at", "id")[:batch_size]
+            )
+            if not orders:
+                break
+            ids = [o.id for o in orders]
+            items = list(OrderItem.objects.filter(order_id__in=ids))
+
+            ArchivedOrder.objects.bulk_create([
+                ArchivedOrder(
+                    id=o.id, user_id=o.user_id, status=o.status, shipping_address=o.shipping_address,
+                    total=o.total, created_at=o.created_at,
+                ) for o in orders
+            ])
+            ArchivedOrderItem.objects.bulk_create([
+                ArchivedOrderItem(
+                    id=it.id, order_id=it.order_id, product_id=it.product_id, seller_id=it.seller_id, product_name=it.product_name,
+                    price=it.price, quantity=it.quantity,
+                ) for it in items
+            ])
+            # items cascade; payments keep their (unconstrained) order_id
+            Order.objects.filter(id__in=ids).delete()
+
+        report["orders"] += len(orders)
+        report["items"] += len(items)
+        report["batches"] += 1
+    return report
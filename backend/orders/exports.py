@@ -0,0 +1,38 @@
+from .models import OrderItem
+from api.exports import keyset_batches
+
+ORDER_FIELDS = ("id", "user_id", "status", "shipping_address", "total", "created_at")
+ITEM_FIELDS = ("id", "order_id", "product_id", "seller_id", "product_name", "price", "quantity")
+
+# CSV: one row per order line, order columns repeated
+ORDER_CSV_COLUMNS = [
+    "order_id", "user_id", "status", "shipping_address", "total", "created_at",
+    "item_id", "product_id", "seller_id", "product_name", "price", "quantity",
+]
+
+
+def order_records(qs, batch_size=None):
+    """Orders with their items nested, one keyset batch of orders + one items query at a time."""
+    for orders in keyset_batches(qs, ORDER_FIELDS, batch_size):
+        items = {o["id"]: [] for o in orders}
+        rows = (OrderItem.objects.filter(order_id__in=list(items)).order_by("order_id", "id")
+                .values(*ITEM_FIELDS).iterator(chunk_size=len(orders) * 4))
+        for r in rows:
+            items[r.pop("order_id")].append(r)
+        for o in orders:
+            o["items"] = items[o["id"]]
+            yield o
+
+
+def order_csv_rows(order):
+    head = {
+        "order_id": order["id"], "user_id": order["user_id"], "status": order["status"],
+        "shipping_address": order["shipping_address"], "total": order["total"], "created_at": order["created_at"],
+    }
+    if not order["items"]:
+        return [head]
+    return [
+        {**head, "item_id": it["id"], "product_id": it["product_id"], "seller_id": it["seller_id"],
+         "product_name": it["product_name"], "price": it["price"], "quantity": it["quantity"]}
+        for it in order["items"]
+    ]
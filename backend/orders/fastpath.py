@@ -0,0 +1,47 @@
+from collections import defaultdict
+
+from rest_framework import serializers
+
+from .models import OrderItem
+
+_money = serializers.DecimalField(max_digits=10, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+
+ORDER_VALUES = ("id", "status", "shipping_address", "total", "created_at")
+
+
+def order_rows(qs) -> list[dict]:
+    """OrderSerializer(qs, many=True).data from two values() queries (orders, then their items)."""
+    return format_order_rows(qs.values(*ORDER_VALUES))
+
+
+def format_order_rows(orders) -> list[dict]:
+    """Same as order_rows, for rows already fetched with .values(*ORDER_VALUES)."""
+    money, dt = _money.to_representation, _datetime.to_representation
+    orders = list(orders)
+
+    items = defaultdict(list)
+    rows = (OrderItem.objects.filter(order_id__in=[o["id"] for o in orders]).order_by("id")
+            .values("id", "order_id", "product_id", "product_name", "price", "quantity"))
+    for r in rows:
+        items[r["order_id"]].append({
+            "id": r["id"],
+            "product": r["product_id"],
+            "product_name": r["product_name"],
+            "price": money(r["price"]),
+            "quantity": r["quantity"],
+            "subtotal": float(r["price"]) * int(r["quantity"]),
+        })
+
+    return [
+        {
+            "id": o["id"],
+            "status": o["status"],
+            "shipping_address": o["shipping_address"],
+            "total": money(o["total"]),
+            "created_at": dt(o["created_at"]),
+            "items": items[o["id"]],
+        }
+        for o in orders
+    ]
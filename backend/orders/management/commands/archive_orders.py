@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from orders.archive import archive_orders
+
+
+class Command(BaseCommand):
+    help = "Move orders older than --days into the archive tables in small batches (safe to run online)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.ORDER_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=settings.ORDER_ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--max-batches", dest="max_batches", type=int, default=None,
+                            help="Stop after this many batches (spread a large backlog over several runs)")
+
+    def handle(self, *args, **options):
+        report = archive_orders(options["days"], options["batch_size"], options["max_batches"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {report['orders']} orders / {report['items']} items "
+            f"created before {report['cutoff']} ({report['batches']} batches)."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from orders.models import OrderItem
+from store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Fill OrderItem.seller from the product's current owner for lines created before the column existed. Re-runnable."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        owner = Subquery(Product.objects.filter(id=OuterRef("product_id")).values("owner_id")[:1])
+        filled = 0
+        last_id = 0
+        while True:
+            ids = list(
+                OrderItem.objects.filter(id__gt=last_id, seller__isnull=True)
+                .order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            # one UPDATE ... SET seller_id = (SELECT owner_id ...) per batch
+            filled += OrderItem.objects.filter(id__in=ids).update(seller_id=owner)
+            self.stdout.write(f"  filled {filled} order lines (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill done: {filled} order lines now carry their seller."))
@@ -0,0 +1,129 @@
+import multiprocessing
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, DatabaseError
+from django.db.models import Sum
+
+from cart.models import Cart, CartItem
+from orders import services
+from orders.models import Order, OrderItem
+from store.models import Category, Product
+
+User = get_user_model()
+
+
+def _worker(user_ids, product_ids, checkouts, max_lines, seed):
+    """Runs in a child process: each user repeatedly fills an overlapping cart and checks out."""
+    connections.close_all()  # never share the parent's socket
+    rng = random.Random(seed)
+    stats = {"ok": 0, "sold_out": 0, "errors": 0, "error_samples": []}
+    try:
+        for _ in range(checkouts):
+            for user_id in user_ids:
+                user = User.objects.get(pk=user_id)
+                cart, _ = Cart.objects.get_or_create(user=user)
+                # random subset in random order: unordered locking would deadlock here
+                lines = rng.sample(product_ids, rng.randint(1, min(max_lines, len(product_ids))))
+                CartItem.objects.bulk_create([
+                    CartItem(cart=cart, product_id=pid, quantity=rng.randint(1, 3)) for pid in lines
+                ])
+                try:
+                    services.convert_cart_to_order(user)
+                    stats["ok"] += 1
+                except ValueError:
+                    stats["sold_out"] += 1
+                    CartItem.objects.filter(cart=cart).delete()
+                except DatabaseError as e:
+                    stats["errors"] += 1
+                    if len(stats["error_samples"]) < 3:
+                        stats["error_samples"].append(str(e)[:200])
+                    CartItem.objects.filter(cart=cart).delete()
+    finally:
+        connections.close_all()
+    stats.update({k: v for k, v in services.checkout_stats.items()})
+    return stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Checkout stress test: many processes check out overlapping carts of low-stock products at once. "
+        "Reports orders/s, lock wait, deadlocks and retries, then checks that no stock was oversold. "
+        "Writes throwaway stress-* rows to the configured database (run it against PostgreSQL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--users", type=int, default=64, help="Buyers, spread over the processes")
+        parser.add_argument("--checkouts", type=int, default=10, help="Checkouts per buyer")
+        parser.add_argument("--products", type=int, default=10, help="Hot products shared by every cart")
+        parser.add_argument("--stock", type=int, default=200, help="Initial stock per product")
+        parser.add_argument("--max-lines", dest="max_lines", type=int, default=4, help="Max products per cart")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Keep the stress-* rows for inspection")
+
+    def handle(self, *args, **opts):
+        if connection.vendor == "sqlite":
+            self.stdout.write(self.style.WARNING(
+                "sqlite: a single writer at a time; this checks the invariant but says nothing about throughput."
+            ))
+
+        tag = f"stress-{int(time.time())}"
+        cat = Category.objects.create(name=tag)
+        products = [
+            Product.objects.create(category=cat, name=f"{tag}-{i}", price=Decimal("10.00"), stock=opts["stock"])
+            for i in range(opts["products"])
+        ]
+        product_ids = [p.id for p in products]
+        users = [User.objects.create(username=f"{tag}-{i}") for i in range(opts["users"])]
+        buckets = [[u.id for u in users[i::opts["processes"]]] for i in range(opts["processes"])]
+
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        started = time.perf_counter()
+        with ctx.Pool(opts["processes"]) as pool:
+            results = pool.starmap(_worker, [
+                (bucket, product_ids, opts["checkouts"], opts["max_lines"], opts["seed"] + i)
+                for i, bucket in enumerate(buckets) if bucket
+            ])
+        elapsed = time.perf_counter() - started
+
+        total = {k: sum(r[k] for r in results) for k in services.checkout_stats}
+        for k in ("ok", "sold_out", "errors"):
+            total[k] = sum(r[k] for r in results)
+        self.stdout.write(
+            f"{total['ok']} orders in {elapsed:.2f}s ({total['ok'] / elapsed:.1f} orders/s), "
+            f"sold out {total['sold_out']}, db errors {total['errors']}\n"
+            f"attempts {total['attempts']}, retries {total['retries']} "
+            f"(deadlocks {total['deadlocks']}, serialization {total['serialization_failures']}, busy {total['busy']}), "
+            f"lock wait {total['lock_wait']:.2f}s total / "
+            f"{1000 * total['lock_wait'] / max(total['attempts'], 1):.1f}ms per attempt"
+        )
+        for r in results:
+            for sample in r["error_samples"]:
+                self.stdout.write(self.style.WARNING(f"  error: {sample}"))
+
+        failures = self.check_invariant(products, opts["stock"])
+        if not opts["keep"]:
+            Order.objects.filter(user__in=users).delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+            Product.objects.filter(pk__in=product_ids).delete()
+            cat.delete()
+        if failures:
+            raise CommandError("Invariant violated:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("Invariant holds: final stock = initial - ordered, none negative."))
+
+    def check_invariant(self, products, initial):
+        sold = dict(
+            OrderItem.objects.filter(product__in=products).values("product_id")
+            .annotate(qty=Sum("quantity")).order_by().values_list("product_id", "qty")
+        )
+        failures = []
+        for p in Product.objects.filter(pk__in=[p.pk for p in products]).order_by("id"):
+            ordered = sold.get(p.id, 0)
+            if p.stock < 0 or p.stock != initial - ordered:
+                failures.append(f"  {p.name}: initial {initial}, ordered {ordered}, final {p.stock}")
+        return failures
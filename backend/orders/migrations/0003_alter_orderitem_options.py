@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_archive'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='orderitem',
+            options={'ordering': ['id']},
+        ),
+    ]
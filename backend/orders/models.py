@@ -16,6 +16,7 @@ class Order(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["created_at", "id"])]  # archive mover scans oldest-first
 
     def __str__(self):
         return f"Order#{self.pk} by {self.user.username} - {self.status}"
@@ -23,10 +24,50 @@ class Order(models.Model):
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.PROTECT)  # keep link for admin; snapshot fields below
+    # product owner at purchase time, so seller fulfilment lists don't join through the catalog
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="sold_items"
+    )
     product_name = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)  # snapshot at purchase time
     quantity = models.PositiveIntegerField()
 
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["seller", "-id"])]  # seller fulfilment feed (newest lines first)
+
+    @property
+    def subtotal(self):
+        return (self.price or 0) * self.quantity
+
+
+# --- archive tier: orders older than ORDER_ARCHIVE_AFTER_DAYS are moved here (same ids) ---
+class ArchivedOrder(models.Model):
+    id = models.BigIntegerField(primary_key=True)  # keeps the original Order id
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="archived_orders")
+    status = models.CharField(max_length=20, choices=Order.Status.choices)
+    shipping_address = models.TextField(blank=True)
+    total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    created_at = models.DateTimeField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"ArchivedOrder#{self.pk} - {self.status}"
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name="items")
+    product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="+")
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    product_name = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+
     @property
     def subtotal(self):
         return (self.price or 0) * self.quantity
@@ -0,0 +1,7 @@
+from api.pagination import CountedCursorPagination
+
+
+class OrderCursorPagination(CountedCursorPagination):
+    """Newest orders first; opt-in like the product listing."""
+    page_size = 20
+    ordering = ("-created_at", "-id")
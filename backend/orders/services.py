@@ -1,10 +1,74 @@
+import logging
+import random
+import time
 from decimal import Decimal
-from django.db import transaction
+
+from django.conf import settings
+from django.db import transaction, OperationalError
 from cart.models import Cart, CartItem
 from store.models import Product
+from store.inventory import take_from_shards
+from ruhcart.queue import enqueue
 from .models import Order, OrderItem
 
+logger = logging.getLogger(__name__)
+
+# per-process counters, read by `manage.py stress_checkout`
+checkout_stats = {
+    "attempts": 0, "retries": 0, "deadlocks": 0, "serialization_failures": 0, "busy": 0, "lock_wait": 0.0,
+}
+
+_DEADLOCK, _SERIALIZATION = "40P01", "40001"
+
+
+def _retry_reason(exc: OperationalError) -> str | None:
+    code = getattr(exc.__cause__, "sqlstate", None) or getattr(exc.__cause__, "pgcode", None)
+    if code == _DEADLOCK:
+        return "deadlocks"
+    if code == _SERIALIZATION:
+        return "serialization_failures"
+    if "database is locked" in str(exc):  # sqlite's single writer
+        return "busy"
+    return None
+
+
+class CheckoutBusy(OperationalError):
+    """Still deadlocking / failing serialization after CHECKOUT_MAX_RETRIES; the client may try again."""
+
+
+def with_checkout_retries(fn, user, *args):
+    """
+    fn(user, *args), which must do all its work in one transaction, run again on deadlocks and
+    serialization failures: those roll the whole transaction back, so it is safe to repeat
+    (up to CHECKOUT_MAX_RETRIES times, then CheckoutBusy).
+    """
+    if transaction.get_connection().in_atomic_block:
+        # inside an outer transaction the rollback isn't ours to retry; the caller's loop does it
+        return fn(user, *args)
+    attempt = 0
+    while True:
+        checkout_stats["attempts"] += 1
+        try:
+            return fn(user, *args)
+        except OperationalError as e:
+            reason = _retry_reason(e)
+            if reason is None:
+                raise
+            if attempt >= settings.CHECKOUT_MAX_RETRIES:
+                raise CheckoutBusy("Checkout is busy, please try again.") from e
+            attempt += 1
+            checkout_stats["retries"] += 1
+            checkout_stats[reason] += 1
+            logger.warning("checkout retry %d for user %s (%s)", attempt, user.pk, reason)
+            time.sleep(random.uniform(0, settings.CHECKOUT_RETRY_BACKOFF * 2 ** attempt))
+
+
 def convert_cart_to_order(user, shipping_address: str = "") -> Order:
+    """Checkout, retried as a whole on deadlocks and serialization failures (with_checkout_retries)."""
+    return with_checkout_retries(_convert_cart_to_order, user, shipping_address)
+
+
+def _convert_cart_to_order(user, shipping_address: str) -> Order:
     with transaction.atomic():
         cart, _ = Cart.objects.select_for_update().get_or_create(user=user)
         items = list(CartItem.objects.select_for_update()
@@ -12,14 +76,18 @@ def convert_cart_to_order(user, shipping_address: str = "") -> Order:
         if not items:
             raise ValueError("Cart is empty.")
 
-        # lock products
-        product_ids = [it.product_id for it in items]
-        products = {p.id: p for p in Product.objects.select_for_update().filter(id__in=product_ids)}
+        # lock products in id order, so two overlapping carts can't lock them crosswise and deadlock
+        # (sharded flash-sale products skip the row lock; their shards are decremented below)
+        product_ids = [it.product_id for it in items if not it.product.sharded_stock]
+        started = time.perf_counter()
+        products = {p.id: p for p in Product.objects.select_for_update().filter(id__in=product_ids).order_by("id")}
+        checkout_stats["lock_wait"] += time.perf_counter() - started
+        products.update({it.product_id: it.product for it in items if it.product.sharded_stock})
 
         # validate stock
         for it in items:
             p = products[it.product_id]
-            if p.stock is not None and it.quantity > p.stock:
+            if not p.sharded_stock and p.stock is not None and it.quantity > p.stock:
                 raise ValueError(f"Not enough stock for {p.name}.")
 
         # create order (paid in this flow)
@@ -31,8 +99,10 @@ def convert_cart_to_order(user, shipping_address: str = "") -> Order:
             p = products[it.product_id]
             price = p.price
             total += Decimal(price) * it.quantity
-            bulk_items.append(OrderItem(order=order, product=p, product_name=p.name, price=price, quantity=it.quantity))
-            if p.stock is not None:
+            bulk_items.append(OrderItem(order=order, product=p, seller_id=p.owner_id, product_name=p.name, price=price, quantity=it.quantity))
+            if p.sharded_stock:
+                take_from_shards(p, it.quantity)  # raises ValueError -> whole order rolls back
+            elif p.stock is not None:
                 p.stock -= it.quantity
                 p.save(update_fields=["stock"])
 
@@ -43,4 +113,15 @@ def convert_cart_to_order(user, shipping_address: str = "") -> Order:
         # clear cart
         CartItem.objects.filter(cart=cart).delete()
 
+        transaction.on_commit(lambda: _after_checkout(order))
+
     return order
+
+
+def _after_checkout(order: Order) -> None:
+    # background bookkeeping; never fails the checkout
+    for task in ("store.tasks.record_order_sales", "store.tasks.fold_order_into_related"):
+        try:
+            enqueue(task, order.id)
+        except Exception:
+            pass
@@ -1,6 +1,7 @@
 from celery import shared_task
 from django.core.mail import send_mail
 from .models import Order
+from .archive import archive_orders
 
 @shared_task
 def send_order_confirmation(order_id: int):
@@ -12,3 +13,8 @@ def send_order_confirmation(order_id: int):
     body = f"Hi {order.user.username}, your order total is ₹{order.total}."
     send_mail(subject, body, "no-reply@ruhcart.local", [order.user.email or "demo@example.com"])
     return "ok"
+
+
+@shared_task
+def archive_old_orders():
+    return archive_orders()
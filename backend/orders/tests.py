@@ -1,3 +1,40 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.renderers import FastJSONRenderer
+from store.models import Category, Product
+from .fastpath import order_rows
+from .models import Order, OrderItem
+from .serializers import OrderSerializer
+
+
+class FastOrderRowsTests(TestCase):
+    """orders.fastpath must render byte-for-byte what OrderSerializer + JSONRenderer do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username="buyer", password="x")
+        category = Category.objects.create(name="Kitchen")
+        pan = Product.objects.create(category=category, name="Pan", price=Decimal("24.90"), stock=5)
+        mug = Product.objects.create(category=category, name="Mug", price=Decimal("3.33"), stock=5)
+        order = Order.objects.create(user=cls.user, total=Decimal("56.46"), shipping_address="1 Road\nCity")
+        OrderItem.objects.create(order=order, product=pan, product_name="Pan", price=Decimal("24.90"), quantity=2)
+        OrderItem.objects.create(order=order, product=mug, product_name="Mug ☕", price=Decimal("3.33"), quantity=2)
+        Order.objects.create(user=cls.user, status=Order.Status.PENDING)  # no items
+
+    def test_order_list_is_byte_identical(self):
+        orders = Order.objects.filter(user=self.user).prefetch_related("items")
+        expected = JSONRenderer().render(OrderSerializer(orders, many=True).data)
+        self.assertEqual(FastJSONRenderer().render(order_rows(orders)), expected)
 
-# Create your tests here.
+    def test_paginated_page_matches_unpaginated_list(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        full = client.get("/api/orders/").json()
+        page = client.get("/api/orders/?page_size=1").json()
+        self.assertEqual(page["results"], full[:1])
+        self.assertEqual(client.get(page["next"]).json()["results"], full[1:2])
@@ -1,15 +1,19 @@
+from django.conf import settings
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 
-from .models import Order
-from .serializers import OrderSerializer, OrderCreateSerializer
-from .services import convert_cart_to_order  # <-- use the service
-from orders.tasks import send_order_confirmation  # <-- send email task
+from .models import Order, ArchivedOrder
+from .serializers import OrderSerializer, OrderCreateSerializer, ArchivedOrderSerializer
+from .fastpath import ORDER_VALUES, order_rows, format_order_rows
+from .pagination import OrderCursorPagination
+from .services import CheckoutBusy, convert_cart_to_order  # <-- use the service
+from ruhcart.queue import enqueue  # tasks load lazily (see ruhcart.queue)
 
 
 class OrdersViewSet(viewsets.GenericViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination  # opt-in via ?cursor= / ?page_size=
 
     def get_queryset(self):
         return (
@@ -18,17 +22,37 @@ class OrdersViewSet(viewsets.GenericViewSet):
             .prefetch_related("items")
         )
 
-    # GET /api/orders/
+    def get_archived_queryset(self):
+        return ArchivedOrder.objects.filter(user=self.request.user).prefetch_related("items")
+
+    # GET /api/orders/   (?include_archived=1 appends orders moved to the archive tier; paginated: live orders only)
     def list(self, request):
         orders = self.get_queryset()
-        return Response(OrderSerializer(orders, many=True).data)
+        if settings.FAST_SERIALIZERS:
+            page = self.paginate_queryset(orders.values(*ORDER_VALUES))
+            if page is not None:
+                return self.get_paginated_response(format_order_rows(page))
+        else:
+            page = self.paginate_queryset(orders)
+            if page is not None:
+                return self.get_paginated_response(OrderSerializer(page, many=True).data)
+        if settings.FAST_SERIALIZERS:
+            data = order_rows(orders)
+        else:
+            data = OrderSerializer(orders, many=True).data
+        if request.query_params.get("include_archived") in ("1", "true"):
+            data += ArchivedOrderSerializer(self.get_archived_queryset(), many=True).data
+        return Response(data)
 
-    # GET /api/orders/<id>/
+    # GET /api/orders/<id>/   (falls through to the archive tier)
     def retrieve(self, request, pk=None):
         order = self.get_queryset().filter(pk=pk).first()
-        if not order:
-            return Response({"detail": "Not found."}, status=404)
-        return Response(OrderSerializer(order).data)
+        if order:
+            return Response(OrderSerializer(order).data)
+        archived = self.get_archived_queryset().filter(pk=pk).first()
+        if archived:
+            return Response(ArchivedOrderSerializer(archived).data)
+        return Response({"detail": "Not found."}, status=404)
 
     # POST /api/orders/  (convert cart -> order via service)
     def create(self, request):
@@ -40,10 +64,12 @@ class OrdersViewSet(viewsets.GenericViewSet):
             order = convert_cart_to_order(request.user, shipping_address)
         except ValueError as e:
             return Response({"detail": str(e)}, status=400)
+        except CheckoutBusy as e:
+            return Response({"detail": str(e)}, status=503, headers={"Retry-After": "1"})
 
         # fire-and-forget email (CELERY_TASK_ALWAYS_EAGER=True runs inline in dev)
         try:
-            send_order_confirmation.delay(order.id)
+            enqueue("orders.tasks.send_order_confirmation", order.id)
         except Exception:
             # don't block order creation if the task enqueue fails
             pass
@@ -1,9 +1,38 @@
+import json
+
 from django.contrib import admin
-from .models import Payment
+from django.utils.html import format_html
+from api.counting import EstimatedCountPaginator
+from .models import Payment, PaymentEvent, ReconciliationCheckpoint
+
+class PaymentEventInline(admin.TabularInline):
+    model = PaymentEvent
+    extra = 0
+    can_delete = False
+    fields = ("event", "received_at", "body")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="payload")
+    def body(self, obj):
+        return format_html("<pre>{}</pre>", json.dumps(obj.payload, indent=2))
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     list_display = ("provider","rzp_payment_id","status","amount_paise","user","order","created_at")
     search_fields = ("rzp_payment_id","rzp_order_id","user__username")
     list_filter = ("provider","status","created_at")
-    readonly_fields = ("payload",)
+    ordering = ("-created_at","-id")  # newest first, off the (created_at, id) index
+    list_select_related = ("user","order__user")  # Order.__str__ shows the buyer
+    raw_id_fields = ("user","order")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    exclude = ("payload",)
+    inlines = [PaymentEventInline]
+
+@admin.register(ReconciliationCheckpoint)
+class ReconciliationCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("provider","synced_until","updated_at")
+    readonly_fields = ("provider","synced_until","last_report","updated_at")
@@ -0,0 +1,12 @@
+from api.exports import keyset_batches
+
+PAYMENT_COLUMNS = [
+    "id", "provider", "user_id", "order_id", "rzp_order_id", "rzp_payment_id",
+    "amount_paise", "status", "signature_valid", "created_at", "updated_at",
+]
+
+
+def payment_records(qs, batch_size=None):
+    # raw webhook bodies (PaymentEvent) stay out of exports
+    for batch in keyset_batches(qs, PAYMENT_COLUMNS, batch_size):
+        yield from batch
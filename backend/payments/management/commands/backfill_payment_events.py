@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from payments.models import Payment, PaymentEvent
+
+
+class Command(BaseCommand):
+    help = "Move legacy Payment.payload blobs into compressed PaymentEvent rows, in id-ordered batches. Re-runnable."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", dest="batch_size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        moved = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Payment.objects.filter(id__gt=last_id).exclude(payload={})
+                .order_by("id").only("id", "payload", "updated_at")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            with transaction.atomic():
+                PaymentEvent.objects.bulk_create([
+                    PaymentEvent.build(p, p.payload, event=p.payload.get("event", ""), received_at=p.updated_at)
+                    for p in batch
+                ])
+                # .update() so updated_at (auto_now) keeps its original value
+                Payment.objects.filter(id__in=[p.id for p in batch]).update(payload={})
+            moved += len(batch)
+            self.stdout.write(f"  moved {moved} payloads (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill done: {moved} payloads moved to PaymentEvent."))
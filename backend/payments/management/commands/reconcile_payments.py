@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+from payments.reconcile import reconcile_payments, StubSource
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile local payments with the provider's payment list since the last checkpoint. "
+        "--stub reads provider payments from a JSON file instead of calling the API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stub", help="JSON file: list (or {'items': [...]}) of provider payment entities")
+        parser.add_argument("--since", help="ISO datetime; overrides the checkpoint for this run")
+        parser.add_argument("--page-size", dest="page_size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        source = StubSource.from_file(options["stub"]) if options["stub"] else None
+        since = parse_datetime(options["since"]) if options["since"] else None
+        report = reconcile_payments(source=source, since=since, page_size=options["page_size"])
+        for k, v in report.items():
+            self.stdout.write(f"  {k}: {v}")
+        self.stdout.write(self.style.SUCCESS("Reconciliation done; checkpoint moved."))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_alter_payment_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='cart_fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='reconciled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import json
+import zlib
+
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class Payment(models.Model):
     class Provider(models.TextChoices):
@@ -19,16 +23,65 @@ class Payment(models.Model):
     rzp_payment_id = models.CharField(max_length=64, unique=True)  # idempotency
     signature_valid = models.BooleanField(default=False)
 
-    amount_paise = models.IntegerField(default=0)
+    amount_paise = models.IntegerField(default=0)  # amount the provider order was created for
+    cart_fingerprint = models.CharField(max_length=64, blank=True)  # cart contents at create_order (payments.services)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.CREATED)
 
-    payload = models.JSONField(default=dict, blank=True)  # full webhook payload for audit
+    # legacy: raw webhook bodies now live in PaymentEvent; emptied by `manage.py backfill_payment_events`
+    payload = models.JSONField(default=dict, blank=True)
 
-    # link to internal Order when created
-    order = models.ForeignKey("orders.Order", null=True, blank=True, on_delete=models.SET_NULL, related_name="payments")
+    # link to internal Order when created; no FK constraint so the id survives the order moving
+    # to orders.ArchivedOrder (see orders.archive)
+    order = models.ForeignKey("orders.Order", null=True, blank=True, on_delete=models.DO_NOTHING,
+                              db_constraint=False, related_name="payments")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)  # last check against the provider API
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"])]  # admin created_at list filter / default sort
 
     def __str__(self):
         return f"{self.provider}:{self.rzp_payment_id} ({self.status})"
+
+
+# append-only audit log of raw webhook bodies, zlib-compressed and kept off the hot Payment row
+class PaymentEvent(models.Model):
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name="events")
+    event = models.CharField(max_length=64, blank=True)
+    month = models.CharField(max_length=7, db_index=True)  # "YYYY-MM" bucket for archiving/pruning old events
+    body_z = models.BinaryField()
+    received_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["received_at"]
+        indexes = [models.Index(fields=["payment", "received_at"])]
+
+    def __str__(self):
+        return f"{self.event or 'event'} @ {self.received_at:%Y-%m-%d %H:%M}"
+
+    @classmethod
+    def build(cls, payment, body, event="", received_at=None):
+        if not isinstance(body, (bytes, bytearray)):
+            body = json.dumps(body, separators=(",", ":")).encode("utf-8")
+        received_at = received_at or timezone.now()
+        return cls(
+            payment=payment, event=event, month=received_at.strftime("%Y-%m"),
+            body_z=zlib.compress(bytes(body), 6), received_at=received_at,
+        )
+
+    @property
+    def payload(self):
+        return json.loads(zlib.decompress(self.body_z).decode("utf-8") or "{}")
+
+
+# how far the bulk reconciliation job (payments.reconcile) has read the provider's payment list
+class ReconciliationCheckpoint(models.Model):
+    provider = models.CharField(max_length=20, choices=Payment.Provider.choices, unique=True)
+    synced_until = models.DateTimeField(null=True, blank=True)
+    last_report = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.provider} reconciled until {self.synced_until}"
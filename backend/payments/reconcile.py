@@ -0,0 +1,153 @@
+"""
+Bulk reconciliation: page through the provider's payments for the window since the
+last checkpoint, diff each page against local rows in one query, bulk_update only the
+rows whose payment id or status actually drifted.
+"""
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Payment, ReconciliationCheckpoint
+from .services import PENDING_PREFIX
+
+logger = logging.getLogger(__name__)
+
+STATUSES = {
+    "created": Payment.Status.CREATED,
+    "authorized": Payment.Status.AUTHORIZED,
+    "captured": Payment.Status.CAPTURED,
+    "failed": Payment.Status.FAILED,
+}
+SETTLED = (Payment.Status.CAPTURED, Payment.Status.AUTHORIZED)
+UNSETTLED = (Payment.Status.CREATED, Payment.Status.FAILED)
+CLAIM_ORDER = {"captured": 0, "authorized": 1, "created": 2, "failed": 3}  # who gets a checkout's row first
+
+
+class RazorpaySource:
+    """Provider payments API: GET /payments?from=&to=&count=&skip= (created_at window, unix seconds)."""
+
+    def __init__(self):
+        import razorpay  # heavy client, only needed by the job
+
+        self.client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+
+    def page(self, start, end, skip, count) -> list[dict]:
+        params = {"from": int(start.timestamp()), "to": int(end.timestamp()), "count": count, "skip": skip}
+        return self.client.payment.all(params).get("items", [])
+
+
+class StubSource:
+    """Same interface over a list of provider payment entities (e.g. a JSON dump), for local runs."""
+
+    def __init__(self, items):
+        self.items = sorted(items, key=lambda e: e.get("created_at", 0))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as fh:
+            data = json.load(fh)
+        return cls(data.get("items", []) if isinstance(data, dict) else data)
+
+    def page(self, start, end, skip, count) -> list[dict]:
+        lo, hi = start.timestamp(), end.timestamp()
+        window = [e for e in self.items if lo <= e.get("created_at", 0) <= hi]
+        return window[skip:skip + count]
+
+
+def _diff(entities, now) -> tuple[list[Payment], dict]:
+    """
+    Local rows that need changes for one page of provider payments (one indexed query).
+
+    A customer who retries pays several times against one provider order, and a local row
+    is one checkout (one provider order). Successful attempts are matched first, so a failed
+    attempt can't take the row the captured payment belongs to; a row already matched to a
+    failed/created attempt (this run or an earlier one) moves to the successful one.
+    """
+    by_payment = {e["id"]: e for e in entities if e.get("id")}
+    orders = {e["order_id"] for e in entities if e.get("order_id")}
+    stats = {"seen": len(entities), "updated": 0, "claimed": 0, "superseded": 0, "unknown": 0,
+             "amount_mismatch": 0, "captured_without_order": 0}
+
+    rows = list(Payment.objects.filter(Q(rzp_payment_id__in=list(by_payment)) | Q(rzp_order_id__in=orders)).order_by("id"))
+    known_orders = {p.rzp_order_id for p in rows}
+    local = {p.rzp_payment_id: p for p in rows}
+    claimable = {}
+    for p in sorted(rows, key=lambda p: not p.rzp_payment_id.startswith(PENDING_PREFIX)):
+        if p.rzp_order_id in orders and (p.rzp_payment_id.startswith(PENDING_PREFIX) or p.status in UNSETTLED):
+            claimable.setdefault(p.rzp_order_id, p)
+    before = {p.pk: (p.rzp_payment_id, p.status) for p in rows}
+
+    touched = {}
+    for pay_id, e in sorted(by_payment.items(), key=lambda item: CLAIM_ORDER.get(item[1].get("status"), len(CLAIM_ORDER))):
+        status = STATUSES.get(e.get("status"))
+        p = local.get(pay_id)
+        if p is not None and p.rzp_payment_id != pay_id:
+            stats["superseded"] += 1  # a successful retry took this row over
+            continue
+        if p is None:
+            p = claimable.get(e.get("order_id"))
+            pending = p is not None and p.rzp_payment_id.startswith(PENDING_PREFIX)
+            if not (pending or (p is not None and status in SETTLED and p.status in UNSETTLED)):
+                # an earlier attempt on a checkout whose row already belongs to another payment
+                stats["superseded" if e.get("order_id") in known_orders else "unknown"] += 1
+                continue
+            del claimable[e["order_id"]]
+            p.rzp_payment_id = pay_id  # verify/webhook never told us (or told us about an earlier attempt)
+            stats["claimed"] += 1
+
+        p.status = status or p.status
+        if int(e.get("amount", 0)) != p.amount_paise:
+            stats["amount_mismatch"] += 1
+            logger.error("payment %s: provider amount %s, expected %s", pay_id, e.get("amount"), p.amount_paise)
+        if p.status == Payment.Status.CAPTURED and p.order_id is None:
+            stats["captured_without_order"] += 1
+            logger.warning("payment %s captured but no order was created (user %s)", pay_id, p.user_id)
+        touched[p.pk] = p
+
+    changed = [p for p in touched.values() if (p.rzp_payment_id, p.status) != before[p.pk]]
+    for p in changed:
+        p.reconciled_at = p.updated_at = now
+    stats["updated"] = len(changed)
+    return changed, stats
+
+
+def reconcile_payments(source=None, since=None, until=None, page_size=None) -> dict:
+    """
+    Reconcile provider payments created in [checkpoint - overlap, now] and move the checkpoint.
+    The overlap re-reads recent payments whose status may still have been changing last run.
+    """
+    source = source or RazorpaySource()
+    page_size = page_size or settings.PAYMENT_RECONCILE_PAGE_SIZE
+    checkpoint, _ = ReconciliationCheckpoint.objects.get_or_create(provider=Payment.Provider.RAZORPAY)
+    now = timezone.now()
+    if since is None:
+        since = (checkpoint.synced_until - timedelta(seconds=settings.PAYMENT_RECONCILE_OVERLAP)
+                 if checkpoint.synced_until else now - timedelta(days=settings.PAYMENT_RECONCILE_LOOKBACK_DAYS))
+    until = until or now
+
+    report = {"from": since.isoformat(), "to": until.isoformat(), "pages": 0}
+    skip = 0
+    while True:
+        entities = source.page(since, until, skip, page_size)
+        if not entities:
+            break
+        changed, stats = _diff(entities, now)
+        if changed:
+            with transaction.atomic():
+                Payment.objects.bulk_update(changed, ["rzp_payment_id", "status", "reconciled_at", "updated_at"])
+        for k, v in stats.items():
+            report[k] = report.get(k, 0) + v
+        report["pages"] += 1
+        if len(entities) < page_size:
+            break
+        skip += page_size
+
+    checkpoint.synced_until = until
+    checkpoint.last_report = report
+    checkpoint.save()
+    return report
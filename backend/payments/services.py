@@ -0,0 +1,78 @@
+import hashlib
+import hmac
+
+from django.conf import settings
+from django.db import transaction
+
+from cart.models import CartItem
+from orders.models import Order
+from orders.services import convert_cart_to_order, with_checkout_retries
+from .models import Payment
+
+PENDING_PREFIX = "order_only::"  # rzp_payment_id placeholder until the provider payment id is known
+
+
+def cart_snapshot(user) -> tuple[int, str]:
+    """
+    (amount in paise, fingerprint) of the user's cart from one query, without creating a cart.
+    The fingerprint covers product, quantity and price, so any change to what would be ordered changes it.
+    """
+    rows = (CartItem.objects.filter(cart__user=user).order_by("product_id")
+            .values_list("product_id", "quantity", "product__price"))
+    total = 0
+    digest = hashlib.sha256()
+    for product_id, qty, price in rows:
+        total += int(round(price * 100)) * qty
+        digest.update(f"{product_id}:{qty}:{price};".encode())
+    return total, digest.hexdigest() if total else ""
+
+
+def _hmac_ok(secret: str, message: bytes, signature: str) -> bool:
+    expected = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+
+def payment_signature_ok(rzp_order_id: str, rzp_payment_id: str, signature: str) -> bool:
+    # Checkout signs "<order_id>|<payment_id>" with the key secret
+    return _hmac_ok(settings.RAZORPAY_KEY_SECRET, f"{rzp_order_id}|{rzp_payment_id}".encode(), signature)
+
+
+def webhook_signature_ok(body: bytes, signature: str, secret: str) -> bool:
+    return _hmac_ok(secret, body, signature)
+
+
+def record_pending_payment(user, rzp_order_id: str, amount_paise: int, fingerprint: str) -> Payment:
+    return Payment.objects.create(
+        provider=Payment.Provider.RAZORPAY, user=user,
+        rzp_order_id=rzp_order_id, rzp_payment_id=f"{PENDING_PREFIX}{rzp_order_id}",
+        amount_paise=amount_paise, cart_fingerprint=fingerprint,
+    )
+
+
+def complete_payment(payment: Payment, user, shipping_address: str = "") -> tuple[Order, bool]:
+    """
+    Turn the user's cart into the order this payment paid for, exactly once
+    (verify and the webhook may both get here). Returns (order, created).
+    Raises ValueError when the cart no longer matches what was paid for or stock ran out.
+    The payment lock and the conversion are retried together on deadlocks and serialization
+    failures; orders.services.CheckoutBusy when that runs out.
+    """
+    return with_checkout_retries(_complete_payment, user, payment.pk, shipping_address)
+
+
+def _complete_payment(user, payment_pk: int, shipping_address: str) -> tuple[Order, bool]:
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().get(pk=payment_pk)
+        if payment.order_id:
+            order = Order.objects.filter(pk=payment.order_id).first()
+            if order:
+                return order, False
+        if payment.cart_fingerprint:
+            amount, fingerprint = cart_snapshot(user)
+            if fingerprint != payment.cart_fingerprint or amount != payment.amount_paise:
+                raise ValueError("Cart changed after payment was started.")
+        order = convert_cart_to_order(user, shipping_address)
+        payment.user = user
+        payment.order = order
+        payment.save(update_fields=["user", "order", "updated_at"])
+    return order, True
@@ -0,0 +1,38 @@
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Payment
+from .reconcile import STATUSES, reconcile_payments as _reconcile_payments
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_payment(payment_id: int):
+    """Confirm a verified payment with the provider after the fact (verify itself never calls out)."""
+    import razorpay  # heavy client, only needed off the request path
+
+    payment = Payment.objects.filter(pk=payment_id).first()
+    if payment is None:
+        return "missing"
+    client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+    remote = client.payment.fetch(payment.rzp_payment_id)
+
+    if int(remote.get("amount", 0)) != payment.amount_paise or remote.get("order_id") != payment.rzp_order_id:
+        logger.error(
+            "payment %s mismatch: provider amount %s order %s, expected %s order %s",
+            payment.rzp_payment_id, remote.get("amount"), remote.get("order_id"),
+            payment.amount_paise, payment.rzp_order_id,
+        )
+    payment.status = STATUSES.get(remote.get("status"), payment.status)
+    payment.reconciled_at = timezone.now()
+    payment.save(update_fields=["status", "reconciled_at", "updated_at"])
+    return payment.status
+
+
+@shared_task
+def reconcile_payments():
+    return _reconcile_payments()
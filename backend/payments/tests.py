@@ -1,3 +1,255 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import Cart, CartItem
+from orders.models import Order
+from store.models import Category, Product
+from . import services
+from .models import Payment, ReconciliationCheckpoint
+from .reconcile import StubSource, reconcile_payments
+from .services import cart_snapshot, record_pending_payment
+
+
+def checkout_signature(rzp_order_id: str, rzp_payment_id: str) -> str:
+    return hmac.new(settings.RAZORPAY_KEY_SECRET.encode(), f"{rzp_order_id}|{rzp_payment_id}".encode(),
+                    hashlib.sha256).hexdigest()
+
+
+def shopper_with_pending_payment(username="payer", rzp_order_id="order_1"):
+    """A user with a one-line cart and the Payment row create_order would have recorded for it."""
+    user = get_user_model().objects.create_user(username=username, password="x")
+    category, _ = Category.objects.get_or_create(name="Books")
+    product = Product.objects.create(category=category, name=f"Atlas {username}", price=Decimal("250.00"), stock=10)
+    CartItem.objects.create(cart=Cart.objects.create(user=user), product=product, quantity=2)
+    payment = record_pending_payment(user, rzp_order_id, *cart_snapshot(user))
+    return user, product, payment
+
+
+WEBHOOK_SECRET = "whsec_test"
+
+
+@override_settings(RAZORPAY_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class VerifyAndWebhookTests(TestCase):
+    """Local HMAC checks, the cart fingerprint and exactly-once order creation across verify and the webhook."""
+
+    def setUp(self):
+        self.user, self.product, self.payment = shopper_with_pending_payment()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def verify(self, signature=None):
+        return self.client.post("/api/pay/razorpay/verify/", {
+            "razorpay_order_id": "order_1",
+            "razorpay_payment_id": "pay_1",
+            "razorpay_signature": signature or checkout_signature("order_1", "pay_1"),
+            "shipping_address": "1 Main St",
+        }, format="json")
+
+    def webhook(self, signature=None):
+        body = json.dumps({"event": "payment.captured", "payload": {"payment": {"entity": {
+            "id": "pay_1", "order_id": "order_1", "amount": self.payment.amount_paise,
+            "status": "captured", "notes": {"user_id": self.user.id},
+        }}}}).encode()
+        signature = signature or hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        return APIClient().post("/api/pay/razorpay/webhook/", body, content_type="application/json",
+                                headers={"X-Razorpay-Signature": signature})
+
+    def test_valid_signature_creates_one_order(self):
+        response = self.verify()
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual((order.user_id, order.total, order.shipping_address), (self.user.id, Decimal("500.00"), "1 Main St"))
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.order_id, self.payment.rzp_payment_id, self.payment.status),
+                         (order.id, "pay_1", Payment.Status.AUTHORIZED))
+        self.assertFalse(CartItem.objects.filter(cart__user=self.user).exists())
+        # verifying again returns the same order
+        self.assertEqual(self.verify().json()["id"], order.id)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_bad_signature_creates_nothing(self):
+        response = self.verify(signature="0" * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.rzp_payment_id, self.payment.signature_valid), ("order_only::order_1", False))
+
+    def test_cart_changed_after_create_order(self):
+        CartItem.objects.filter(cart__user=self.user).update(quantity=3)
+        response = self.verify()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Cart changed", response.json()["detail"])
+        self.assertFalse(Order.objects.exists())
+
+    def test_webhook_after_verify_creates_no_second_order(self):
+        order_id = self.verify().json()["id"]
+        self.assertEqual(self.webhook().status_code, 200)
+        self.assertEqual(list(Order.objects.values_list("id", flat=True)), [order_id])
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.order_id, self.payment.status), (order_id, Payment.Status.CAPTURED))
+
+    def test_webhook_alone_creates_the_order_once(self):
+        self.webhook()
+        self.webhook()
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(self.verify().status_code, 200)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_webhook_with_invalid_signature_changes_nothing(self):
+        self.assertEqual(self.webhook(signature="0" * 64).status_code, 200)
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.signature_valid, self.payment.order_id),
+                         (Payment.Status.CREATED, False, None))
+        self.assertFalse(Order.objects.exists())
+
+
+@override_settings(CHECKOUT_RETRY_BACKOFF=0)
+class CompletePaymentRetryTests(TransactionTestCase):
+    """The payment lock and the cart conversion are retried together, outside any request transaction."""
+
+    def setUp(self):
+        self.user, self.product, self.payment = shopper_with_pending_payment()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def verify(self):
+        return self.client.post("/api/pay/razorpay/verify/", {
+            "razorpay_order_id": "order_1",
+            "razorpay_payment_id": "pay_1",
+            "razorpay_signature": checkout_signature("order_1", "pay_1"),
+        }, format="json")
+
+    def locked_for(self, failures: int):
+        calls = {"n": 0}
+
+        def snapshot(user):
+            calls["n"] += 1
+            if calls["n"] <= failures:
+                raise OperationalError("database is locked")
+            return cart_snapshot(user)
+        return mock.patch.object(services, "cart_snapshot", side_effect=snapshot)
+
+    def test_transient_lock_is_retried(self):
+        with self.locked_for(2):
+            response = self.verify()
+        self.assertEqual(response.status_code, 201)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.order_id, response.json()["id"])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_exhausted_retries_are_503_and_leave_the_cart(self):
+        with self.locked_for(settings.CHECKOUT_MAX_RETRIES + 1):
+            response = self.verify()
+        self.assertEqual(response.status_code, 503)
+        self.payment.refresh_from_db()
+        self.assertIsNone(self.payment.order_id)
+        self.assertEqual(CartItem.objects.filter(cart__user=self.user).count(), 1)
+        # the retry the client is told to make goes through
+        self.assertEqual(self.verify().status_code, 201)
+
+
+class RecordingSource(StubSource):
+    """StubSource that remembers the window and offset of every page requested."""
+
+    def __init__(self, items):
+        super().__init__(items)
+        self.calls = []
+
+    def page(self, start, end, skip, count):
+        self.calls.append((start, end, skip, count))
+        return super().page(start, end, skip, count)
+
+
+class ReconcilePaymentsTests(TestCase):
+    """payments.reconcile against a local stub of the provider's payment list."""
+
+    def setUp(self):
+        self.created = int((timezone.now() - timedelta(minutes=5)).timestamp())
+        patcher = mock.patch("payments.reconcile.logger")  # captured-without-order warnings are expected here
+        self.logger = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def entity(self, pay_id, order_id, status="captured", amount=500, offset=0):
+        return {"id": pay_id, "order_id": order_id, "status": status, "amount": amount, "created_at": self.created + offset}
+
+    def row(self, pay_id, order_id, status=Payment.Status.CREATED, amount=500):
+        return Payment.objects.create(rzp_payment_id=pay_id, rzp_order_id=order_id, status=status, amount_paise=amount)
+
+    def test_pages_through_more_items_than_a_page(self):
+        for i in range(5):
+            self.row(f"pay_{i}", f"order_{i}")
+        source = RecordingSource([self.entity(f"pay_{i}", f"order_{i}", offset=i) for i in range(5)])
+        report = reconcile_payments(source=source, page_size=2)
+        self.assertEqual([skip for _, _, skip, _ in source.calls], [0, 2, 4])
+        self.assertEqual((report["pages"], report["seen"], report["updated"]), (3, 5, 5))
+        self.assertEqual(set(Payment.objects.values_list("status", flat=True)), {Payment.Status.CAPTURED})
+
+    def test_claims_pending_order_only_row(self):
+        pending = Payment.objects.create(rzp_order_id="order_p", rzp_payment_id="order_only::order_p", amount_paise=500)
+        report = reconcile_payments(source=StubSource([self.entity("pay_p", "order_p")]))
+        pending.refresh_from_db()
+        self.assertEqual((pending.rzp_payment_id, pending.status), ("pay_p", Payment.Status.CAPTURED))
+        self.assertEqual((report["claimed"], report["unknown"]), (1, 0))
+
+    def test_captured_retry_replaces_failed_attempt(self):
+        row = self.row("pay_failed", "order_r", status=Payment.Status.FAILED)
+        source = StubSource([
+            self.entity("pay_failed", "order_r", status="failed"),
+            self.entity("pay_retry", "order_r", offset=30),
+        ])
+        report = reconcile_payments(source=source)
+        row.refresh_from_db()
+        self.assertEqual((row.rzp_payment_id, row.status), ("pay_retry", Payment.Status.CAPTURED))
+        self.assertEqual((report["claimed"], report["superseded"], report["unknown"]), (1, 1, 0))
+        self.assertEqual(Payment.objects.count(), 1)
+
+        # a later run over the same window leaves it there
+        report = reconcile_payments(source=source)
+        row.refresh_from_db()
+        self.assertEqual(row.rzp_payment_id, "pay_retry")
+        self.assertEqual((report["updated"], report["superseded"], report["unknown"]), (0, 1, 0))
+
+    def test_amount_mismatch_is_counted(self):
+        self.row("pay_m", "order_m", amount=500)
+        report = reconcile_payments(source=StubSource([self.entity("pay_m", "order_m", amount=400)]))
+        self.assertEqual(report["amount_mismatch"], 1)
+        self.logger.error.assert_called_once()
+
+    def test_bulk_update_touches_only_drifted_rows(self):
+        settled = self.row("pay_ok", "order_ok", status=Payment.Status.CAPTURED)
+        drifted = self.row("pay_drift", "order_drift", status=Payment.Status.AUTHORIZED)
+        source = StubSource([self.entity("pay_ok", "order_ok"), self.entity("pay_drift", "order_drift", offset=1)])
+        with mock.patch.object(Payment.objects, "bulk_update", wraps=Payment.objects.bulk_update) as bulk_update:
+            report = reconcile_payments(source=source)
+        self.assertEqual([[p.pk for p in call.args[0]] for call in bulk_update.call_args_list], [[drifted.pk]])
+        self.assertEqual(report["updated"], 1)
+        settled.refresh_from_db()
+        drifted.refresh_from_db()
+        self.assertIsNone(settled.reconciled_at)
+        self.assertEqual(drifted.status, Payment.Status.CAPTURED)
+        self.assertIsNotNone(drifted.reconciled_at)
+
+    def test_checkpoint_advances_and_next_run_overlaps_it(self):
+        until = timezone.now()
+        reconcile_payments(source=StubSource([]), until=until)
+        checkpoint = ReconciliationCheckpoint.objects.get(provider=Payment.Provider.RAZORPAY)
+        self.assertEqual(checkpoint.synced_until, until)
+
+        source = RecordingSource([])
+        reconcile_payments(source=source)
+        start = source.calls[0][0]
+        self.assertEqual(start, until - timedelta(seconds=settings.PAYMENT_RECONCILE_OVERLAP))
+        checkpoint.refresh_from_db()
+        self.assertGreater(checkpoint.synced_until, until)
+        self.assertEqual(checkpoint.last_report["from"], start.isoformat())
@@ -1,32 +1,25 @@
-from decimal import Decimal
 from django.conf import settings
+from django.db import IntegrityError
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-import razorpay
-
-from cart.models import Cart
-from orders.services import convert_cart_to_order
 from orders.serializers import OrderSerializer
-from orders.tasks import send_order_confirmation
-
-
-def _amount_paise_for_user(user) -> int:
-    cart, _ = Cart.objects.get_or_create(user=user)
-    total = 0.0
-    for it in cart.items.select_related("product").all():
-        total += float(it.product.price) * int(it.quantity)
-    return int(round(total * 100))  # paise
+from orders.services import CheckoutBusy
+from ruhcart.queue import enqueue
+from .models import Payment
+from .services import cart_snapshot, payment_signature_ok, record_pending_payment, complete_payment
 
 
 class RazorpayCreateOrder(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        amount_paise = _amount_paise_for_user(request.user)
+        amount_paise, fingerprint = cart_snapshot(request.user)
         if amount_paise <= 0:
             return Response({"detail": "Cart is empty."}, status=400)
 
+        import razorpay  # ~75ms of imports; only this endpoint talks to the provider
+
         client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
         rzp_order = client.order.create({
             "amount": amount_paise,
@@ -34,6 +27,8 @@ class RazorpayCreateOrder(APIView):
             "payment_capture": 1,  # auto-capture on success
             "notes": {"user_id": request.user.id},
         })
+        # what verify checks against: provider order id, exact amount, cart contents
+        record_pending_payment(request.user, rzp_order["id"], amount_paise, fingerprint)
 
         return Response({
             "order_id": rzp_order["id"],
@@ -59,45 +54,56 @@ class RazorpayVerify(APIView):
           "razorpay_signature": "...",
           "shipping_address": "..."
         }
+        Local only: HMAC check + the Payment row recorded by create_order. The provider
+        is asked about the payment afterwards, in the background (payments.tasks).
         """
         required = ("razorpay_order_id", "razorpay_payment_id", "razorpay_signature")
         if not all(k in request.data for k in required):
             return Response({"detail": "Missing parameters."}, status=400)
-
-        client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET))
+        rzp_order_id = request.data["razorpay_order_id"]
+        rzp_payment_id = request.data["razorpay_payment_id"]
 
         # 1) verify signature
-        try:
-            client.utility.verify_payment_signature({
-                "razorpay_order_id": request.data["razorpay_order_id"],
-                "razorpay_payment_id": request.data["razorpay_payment_id"],
-                "razorpay_signature": request.data["razorpay_signature"],
-            })
-        except razorpay.errors.SignatureVerificationError:
+        if not payment_signature_ok(rzp_order_id, rzp_payment_id, request.data["razorpay_signature"]):
             return Response({"detail": "Invalid signature."}, status=400)
 
-        # 2) (optional) verify amount matches cart
-        try:
-            payment = client.payment.fetch(request.data["razorpay_payment_id"])
-            paid_amount = int(payment.get("amount", 0))  # paise
-        except Exception:
-            paid_amount = None
-
-        expected = _amount_paise_for_user(request.user)
-        if paid_amount is not None and paid_amount != expected:
-            return Response({"detail": "Amount mismatch."}, status=400)
-
-        # 3) convert cart -> internal Order
+        # 2) the payment we created for this provider order (indexed on rzp_order_id)
+        payment = Payment.objects.filter(rzp_order_id=rzp_order_id, user=request.user).order_by("id").first()
+        if payment is None:
+            return Response({"detail": "Unknown payment order."}, status=400)
+        if payment.rzp_payment_id != rzp_payment_id:
+            payment.rzp_payment_id = rzp_payment_id
+            payment.signature_valid = True
+            payment.status = Payment.Status.AUTHORIZED
+            try:
+                payment.save(update_fields=["rzp_payment_id", "signature_valid", "status", "updated_at"])
+            except IntegrityError:
+                return Response({"detail": "Payment already recorded."}, status=400)
+
+        # 3) convert cart -> internal Order (once, and only if the cart is what was paid for)
         try:
-            order = convert_cart_to_order(request.user, request.data.get("shipping_address", ""))
+            order, created = complete_payment(payment, request.user, request.data.get("shipping_address", ""))
         except ValueError as e:
             return Response({"detail": str(e)}, status=400)
+        except CheckoutBusy as e:
+            # paid and recorded; verify again is safe (complete_payment runs once)
+            return Response({"detail": str(e)}, status=503, headers={"Retry-After": "1"})
+        if not created:
+            return Response(OrderSerializer(order).data)
 
         # 4) send confirmation email (async; eager in dev if CELERY_TASK_ALWAYS_EAGER=True)
         try:
-            send_order_confirmation.delay(order.id)
+            enqueue("orders.tasks.send_order_confirmation", order.id)
         except Exception:
             # don't block the response if enqueue fails
             pass
 
+        # 5) provider reconciliation; eager mode would turn it back into a blocking call,
+        #    so there it is left for later (reconciled_at stays NULL)
+        if not settings.CELERY_TASK_ALWAYS_EAGER:
+            try:
+                enqueue("payments.tasks.reconcile_payment", payment.id)
+            except Exception:
+                pass
+
         return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
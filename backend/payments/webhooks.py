@@ -1,5 +1,4 @@
 import json
-import razorpay
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -7,8 +6,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import Payment
-from orders.services import convert_cart_to_order
+from .models import Payment, PaymentEvent
+from .services import PENDING_PREFIX, webhook_signature_ok, complete_payment
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -26,11 +25,7 @@ class RazorpayWebhook(APIView):
         if not (sig and secret):
             return Response({"detail": "Missing signature/secret"}, status=400)
 
-        try:
-            razorpay.Utility.verify_webhook_signature(body, sig, secret)
-            sig_ok = True
-        except razorpay.errors.SignatureVerificationError:
-            sig_ok = False
+        sig_ok = webhook_signature_ok(body, sig, secret)
 
         payload = json.loads(body.decode("utf-8") or "{}")
         event = payload.get("event", "")
@@ -55,49 +50,50 @@ class RazorpayWebhook(APIView):
         if not (rzp_payment_id or rzp_order_id):
             return Response({"detail": "No ids in payload"}, status=400)
 
-        # 3) upsert Payment row (idempotent on rzp_payment_id when present)
+        # 3) upsert Payment row: by rzp_payment_id when present, else the row create_order
+        #    recorded for this provider order (claimed here if verify hasn't run yet)
         obj = None
         if rzp_payment_id:
+            obj = Payment.objects.filter(rzp_payment_id=rzp_payment_id).first()
+        if obj is None and rzp_order_id:
+            obj = Payment.objects.filter(rzp_order_id=rzp_order_id).order_by("id").first()
+            if obj and sig_ok and rzp_payment_id and obj.rzp_payment_id.startswith(PENDING_PREFIX):
+                obj.rzp_payment_id = rzp_payment_id
+                obj.save(update_fields=["rzp_payment_id"])
+        if obj is None:
             obj, _ = Payment.objects.get_or_create(
                 provider=Payment.Provider.RAZORPAY,
-                rzp_payment_id=rzp_payment_id,
+                rzp_payment_id=rzp_payment_id or f"{PENDING_PREFIX}{rzp_order_id}",
                 defaults={"rzp_order_id": rzp_order_id or "", "amount_paise": int(amount or 0)},
             )
-        else:
-            obj = Payment.objects.create(
-                provider=Payment.Provider.RAZORPAY,
-                rzp_payment_id=f"order_only::{rzp_order_id}",
-                rzp_order_id=rzp_order_id or "",
-                amount_paise=int(amount or 0),
-            )
 
-        # status & signature
-        obj.signature_valid = sig_ok
-        if status_str in ("captured","authorized","failed","created"):
-            # map to our enum
-            mapping = {
-                "created": Payment.Status.CREATED,
-                "authorized": Payment.Status.AUTHORIZED,
-                "captured": Payment.Status.CAPTURED,
-                "failed": Payment.Status.FAILED,
-            }
-            obj.status = mapping.get(status_str, obj.status)
-        obj.payload = payload
-        obj.save()
+        # status & signature (an unsigned event is logged below but can't change the payment)
+        if sig_ok:
+            obj.signature_valid = True
+            if status_str in ("captured","authorized","failed","created"):
+                # map to our enum
+                mapping = {
+                    "created": Payment.Status.CREATED,
+                    "authorized": Payment.Status.AUTHORIZED,
+                    "captured": Payment.Status.CAPTURED,
+                    "failed": Payment.Status.FAILED,
+                }
+                obj.status = mapping.get(status_str, obj.status)
+            obj.save(update_fields=["signature_valid", "status", "updated_at"])
+
+        # raw body goes to the compressed, append-only event log instead of the Payment row
+        PaymentEvent.build(obj, body, event=event).save()
 
         # 4) try to link user from order notes, then create internal Order if captured and not created yet
         try:
             notes = payload.get("payload", {}).get("order", {}).get("entity", {}).get("notes") \
                     or payload.get("payload", {}).get("payment", {}).get("entity", {}).get("notes") \
                     or {}
-            user_id = notes.get("user_id")
+            user_id = obj.user_id or notes.get("user_id")
             user = User.objects.filter(id=user_id).first() if user_id else None
             if user and obj.status == Payment.Status.CAPTURED and obj.order_id is None and obj.signature_valid:
-                # create internal order; no shipping address here (frontend /verify path sets it)
-                order = convert_cart_to_order(user, "")
-                obj.user = user
-                obj.order = order
-                obj.save(update_fields=["user","order"])
+                # create internal order once (verify may race us); no shipping address here (frontend /verify path sets it)
+                complete_payment(obj, user, "")
         except Exception:
             # Don’t fail webhook; just acknowledge (you can log this)
             pass
@@ -1 +1,2 @@
-from .celery import app as celery_app  # noqa: F401
+# The Celery app (ruhcart.celery) is not imported here: web processes load it on the first
+# enqueue (ruhcart.queue), and `celery -A ruhcart` finds the ruhcart.celery module itself.
@@ -0,0 +1,12 @@
+from importlib import import_module
+
+
+def enqueue(task: str, *args, **kwargs):
+    """
+    task.delay(*args, **kwargs) by dotted path ("orders.tasks.send_order_confirmation").
+    Celery and the task modules are imported on first use, so a web process that never
+    enqueues anything doesn't pay for them at startup.
+    """
+    import_module("ruhcart.celery")  # configure the app before the shared task binds to it
+    module, name = task.rsplit(".", 1)
+    return getattr(import_module(module), name).delay(*args, **kwargs)
@@ -1,6 +1,8 @@
 from pathlib import Path
 import os
 
+from corsheaders.defaults import default_headers
+
 # --- Paths ---
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # …/backend
 
@@ -34,14 +36,15 @@ INSTALLED_APPS = [
 
 # --- Middleware ---
 MIDDLEWARE = [
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "api.middleware.RuntimeWhiteNoiseMiddleware",  # WhiteNoise + runtime-built snapshots and image variants
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "api.middleware.SiteSessionMiddleware",  # Site*: the Django middleware, skipped for /api/ (JWT only)
     "corsheaders.middleware.CorsMiddleware",
+    "api.middleware.ApiCompressionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "api.middleware.SiteCsrfViewMiddleware",
+    "api.middleware.SiteAuthenticationMiddleware",
+    "api.middleware.SiteMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 WHITENOISE_MAX_AGE = 31536000
@@ -71,6 +74,17 @@ DATABASES = {
     }
 }
 
+# --- Caches (per-process in dev; prod moves the shared ones to Redis when REDIS_URL is set) ---
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # guest carts get their own store so other cache users can't cull them
+    "guest_carts": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "guest-carts",
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+
 # --- Password validation ---
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -89,18 +103,39 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# --- Media (uploaded product images + generated variants) ---
+MEDIA_URL = "media/"
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "http://localhost:8000")  # origin prefixed to media URLs in API payloads
+MEDIA_ROOT = BASE_DIR / "media"
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # --- CORS (dev opens this; prod uses allowed origins) ---
 CORS_ALLOW_ALL_ORIGINS = False
 CORS_ALLOWED_ORIGINS: list[str] = []
+CORS_ALLOW_HEADERS = (*default_headers, "x-guest-cart")  # guest cart token (cart.guest)
 
 # --- DRF / Auth ---
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.FastJSONRenderer",  # orjson, byte-identical to DRF's JSONRenderer
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    # login/registration hash passwords; these budgets are checked before any hashing (api.throttles)
+    "DEFAULT_THROTTLE_RATES": {
+        "auth_ip": os.getenv("AUTH_IP_RATE", "20/min"),
+        "auth_username": os.getenv("AUTH_USERNAME_RATE", "5/min"),
+    },
+    # proxies in front of us that append to X-Forwarded-For; throttles key on the address the
+    # nearest one saw, so client-supplied entries can't pick a fresh bucket. 0 = REMOTE_ADDR only
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", "0")),
 }
+# list endpoints (products, orders, cart) build dicts from values() instead of running the serializers;
+# `manage.py check_fast_serializers` verifies the output is byte-identical
+FAST_SERIALIZERS = True
 AUTH_USER_MODEL = "accounts.User"
 
 # --- Payments (dev defaults; prod overrides via env) ---
@@ -109,8 +144,80 @@ RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "lhbrQkdQ1NUZ82y50pKJsTBk
 RAZORPAY_CURRENCY = "INR"
 FRONTEND_ORIGIN = os.getenv("FRONTEND_ORIGIN", "http://localhost:5173")
 RAZORPAY_WEBHOOK_SECRET = os.getenv("RAZORPAY_WEBHOOK_SECRET", "")
+PAYMENT_RECONCILE_PAGE_SIZE = 100      # provider max per page (payments.reconcile)
+PAYMENT_RECONCILE_OVERLAP = 60 * 60    # seconds re-read before the checkpoint each run
+PAYMENT_RECONCILE_LOOKBACK_DAYS = 3    # first run, before any checkpoint exists
 
 # --- Celery (eager in dev; can flip in prod) ---
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_RESULT_BACKEND = "django-db"
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+
+# --- Catalog ---
+AVAILABILITY_MAX_ITEMS = 300   # ids + slugs per /api/products/availability/ call
+AVAILABILITY_CACHE_TTL = 5     # seconds; stock changes on every checkout
+CATALOG_CACHE_TTL = 300        # cached product/category pages; edits invalidate them (across workers only with Redis, see prod.py)
+CATALOG_CACHE_PREFIXES = ("/api/products/", "/api/categories/")
+CATALOG_SNAPSHOT_DIR = "catalog"  # under STATIC_ROOT; see store.snapshots
+CATALOG_SNAPSHOT_PAGE_SIZE = 100
+CATALOG_SNAPSHOT_MANIFEST_TTL = 60
+CATALOG_CHANGES_PAGE_SIZE = 200  # /api/products/changes/ page size
+PRODUCT_IMAGE_WIDTHS = (320, 640, 1024)  # pre-generated responsive variants (WebP + JPEG)
+PRODUCT_IMAGE_QUALITY = 80
+PRODUCT_IMAGE_MAX_BYTES = 8 * 1024 * 1024
+PRODUCT_IMAGE_MAX_PIXELS = 24_000_000  # checked from the header before decoding; ~100 MB as RGBA
+RELATED_PRODUCTS_TOP_K = 12   # neighbours kept per product for /products/<slug>/related/
+POPULARITY_HALF_LIFE_DAYS = 7    # a sale counts half as much for ?ordering=popular after this long
+STOCK_SHARDS = 8               # counter rows per product in sharded (flash-sale) stock mode
+SUGGEST_LIMIT = 8              # /api/products/suggest/ results per kind; ?limit= up to SUGGEST_MAX_LIMIT
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_MIN_PREFIX = 2         # shorter prefixes return nothing
+SUGGEST_TERM_CHARS = 32        # indexed characters per term (store.suggest)
+SUGGEST_MAX_WORDS = 6          # a name is findable from each of its first N words
+SUGGEST_POLL_INTERVAL = 2      # seconds between a worker's checks for changed products
+SUGGEST_POLL_OVERLAP = 5       # seconds re-read before the last check, for rows committed late
+SUGGEST_MAX_OVERLAY = 5000     # changes replayed onto a worker's index before it rebuilds early
+SUGGEST_REBUILD_INTERVAL = 30 * 60
+SUGGEST_BUILD_IN_BACKGROUND = True  # False builds inside the request (tests)
+SUGGEST_CACHE = None           # cache alias to share the built index through (Redis; not memcached, it's tens of MB)
+SUGGEST_BUILD_LOCK_TTL = 10 * 60
+
+# --- API response compression ---
+API_COMPRESS_MIN_BYTES = 1024  # smaller bodies aren't worth compressing
+API_BROTLI_QUALITY = 5         # used when the optional `brotli` package is installed
+
+# --- Cart ---
+CART_STALE_DAYS = 30           # carts untouched this long are purged
+CART_PURGE_BATCH_SIZE = 500
+GUEST_CART_CACHE = "guest_carts"  # anonymous carts live in this cache alias, not the database (cart.guest)
+GUEST_CART_TTL = 60 * 60 * 24 * 7  # expire this long after their last write
+GUEST_CART_MAX_ITEMS = 50         # distinct products per guest cart; bounds cache memory
+
+# --- Orders ---
+CHECKOUT_MAX_RETRIES = 3        # on deadlock / serialization failure (orders.services)
+CHECKOUT_RETRY_BACKOFF = 0.05   # seconds; doubles per retry, jittered
+ORDER_ARCHIVE_AFTER_DAYS = 365  # older orders move to orders.ArchivedOrder
+ORDER_ARCHIVE_BATCH_SIZE = 200
+
+# --- Exports (api.exports) ---
+EXPORT_BATCH_SIZE = 1000        # rows per keyset query
+EXPORT_CHUNK_BYTES = 64 * 1024  # bytes buffered before a chunk is sent
+
+# --- Large-table counts (api.counting) ---
+ESTIMATED_COUNT_THRESHOLD = 10_000  # above this, counts come from PostgreSQL's planner estimates
+COUNT_CACHE_TTL = 60                # seconds a listing's count is reused (api.pagination)
+
+# --- Cold start (manage.py check_startup_budget / import_times) ---
+STARTUP_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "2500"))  # interpreter start -> first /api/health/ response
+
+# --- Celery beat (periodic jobs) ---
+CELERY_BEAT_SCHEDULE = {
+    "rebalance-stock-shards": {"task": "store.tasks.rebalance_stock_shards", "schedule": 60.0},
+    "purge-stale-carts": {"task": "cart.tasks.purge_stale_carts_task", "schedule": 24 * 60 * 60.0},
+    "build-catalog-snapshots": {"task": "store.tasks.build_catalog_snapshots", "schedule": 300.0},
+    "rebuild-related-products": {"task": "store.tasks.rebuild_related", "schedule": 24 * 60 * 60.0},
+    "rebuild-suggest-index": {"task": "store.tasks.rebuild_suggest_index", "schedule": SUGGEST_REBUILD_INTERVAL},
+    "renormalize-popularity": {"task": "store.tasks.renormalize_popularity", "schedule": 24 * 60 * 60.0},
+    "archive-old-orders": {"task": "orders.tasks.archive_old_orders", "schedule": 24 * 60 * 60.0},
+    "reconcile-payments": {"task": "payments.tasks.reconcile_payments", "schedule": 15 * 60.0},
+}
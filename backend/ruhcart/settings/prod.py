@@ -9,17 +9,38 @@ ALLOWED_HOSTS = [h for h in os.getenv("ALLOWED_HOSTS", "").split(",") if h]
 CORS_ALLOWED_ORIGINS = [o for o in os.getenv("CORS_ALLOWED_ORIGINS", "").split(",") if o]
 CSRF_TRUSTED_ORIGINS = [o for o in os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",") if o]
 
+# Absolute media URLs for the storefront/seller portal (Render sets RENDER_EXTERNAL_URL)
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL") or os.getenv("RENDER_EXTERNAL_URL", "")
+
 # Database: use DATABASE_URL if provided (fallback to sqlite from base)
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
     import dj_database_url
     DATABASES["default"] = dj_database_url.parse(DATABASE_URL, conn_max_age=600)
 
+# Render's load balancer is the one hop in front of gunicorn (see REST_FRAMEWORK["NUM_PROXIES"])
+REST_FRAMEWORK["NUM_PROXIES"] = int(os.getenv("NUM_PROXIES", "1"))
+
 # Security (behind HTTPS proxy)
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 SESSION_COOKIE_SECURE = not DEBUG
 CSRF_COOKIE_SECURE = not DEBUG
 
+# Shared caches. Without REDIS_URL every cache is per worker process: a catalog edit only bumps
+# the catalog version (store.catalog) in the worker that handled it, so with several gunicorn
+# workers the others keep serving cached catalog pages and category trees for up to
+# CATALOG_CACHE_TTL (listing counts for COUNT_CACHE_TTL); each worker also builds its own
+# suggest index (store.suggest) and a guest cart only lives in the worker that wrote it (cart.guest).
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    _redis = {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}
+    CACHES = {
+        "default": _redis,
+        "suggest": {**_redis, "KEY_PREFIX": "suggest"},
+        "guest_carts": {**_redis, "KEY_PREFIX": "guest"},
+    }
+    SUGGEST_CACHE = "suggest"
+
 # If/when you add Redis workers in prod, uncomment:
 # CELERY_TASK_ALWAYS_EAGER = False
 # CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class SellerOrderLineCursorPagination(CursorPagination):
+    """Keyset pagination over (seller, -id); cost doesn't grow with how deep the seller scrolls."""
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = "-id"
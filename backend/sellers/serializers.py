@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from store.models import Product, Category
+from store import inventory
 
 class ProductWriteSerializer(serializers.ModelSerializer):
     category_id = serializers.IntegerField(write_only=True)
@@ -25,4 +26,24 @@ class ProductWriteSerializer(serializers.ModelSerializer):
         for f, v in validated_data.items():
             setattr(instance, f, v)
         instance.save()
+        if instance.sharded_stock and "stock" in validated_data:
+            inventory.set_stock(instance, validated_data["stock"])
         return instance
+
+
+class SellerOrderLineSerializer(serializers.Serializer):
+    """One of the seller's order lines, with the order fields needed to fulfil it."""
+    id = serializers.IntegerField()
+    order_id = serializers.IntegerField()
+    order_status = serializers.CharField(source="order.status")
+    order_created_at = serializers.DateTimeField(source="order.created_at")
+    shipping_address = serializers.CharField(source="order.shipping_address")
+    buyer = serializers.CharField(source="order.user.username")
+    product = serializers.IntegerField(source="product_id")
+    product_name = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    quantity = serializers.IntegerField()
+    subtotal = serializers.SerializerMethodField()
+
+    def get_subtotal(self, obj):
+        return float(obj.price) * int(obj.quantity)
@@ -1,10 +1,20 @@
-from rest_framework import viewsets, mixins, permissions
+from django.conf import settings
+from rest_framework import viewsets, mixins, permissions, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
+from .pagination import SellerOrderLineCursorPagination
 from .permissions import IsSeller
-from .serializers import ProductWriteSerializer
+from .serializers import ProductWriteSerializer, SellerOrderLineSerializer
+from orders.models import Order, OrderItem
 from store.models import Product
 from store.serializers import ProductSerializer  # reuse read serializer
+from store.images import save_original, InvalidImage
+from ruhcart.queue import enqueue
+from store.exports import product_records, PRODUCT_COLUMNS
+from api.exports import export_response
 
 class SellerProductViewSet(mixins.ListModelMixin,
                            mixins.CreateModelMixin,
@@ -26,3 +36,50 @@ class SellerProductViewSet(mixins.ListModelMixin,
     def get_object(self):
         # ensure seller can only access own product by slug
         return get_object_or_404(self.get_queryset(), slug=self.kwargs[self.lookup_field])
+
+    # POST /api/seller/products/<slug>/image/  (multipart, field "image"); variants are built in the background
+    @action(detail=True, methods=["post"], parser_classes=[MultiPartParser, FormParser])
+    def image(self, request, slug=None):
+        product = self.get_object()
+        upload = request.FILES.get("image")
+        if not upload:
+            return Response({"detail": "image file required."}, status=400)
+        if upload.size > settings.PRODUCT_IMAGE_MAX_BYTES:
+            return Response({"detail": "Image too large."}, status=400)
+        try:
+            save_original(product, upload)
+        except InvalidImage as e:
+            return Response({"detail": str(e)}, status=400)
+
+        try:
+            enqueue("store.tasks.build_product_image_variants", product.id)
+        except Exception:
+            # variants can be rebuilt later; the original is saved
+            pass
+        product.refresh_from_db()
+        return Response(ProductSerializer(product).data, status=status.HTTP_202_ACCEPTED)
+
+    # GET /api/seller/products/export/?fmt=csv|jsonl&gzip=1  (streamed)
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        qs = Product.objects.filter(owner=request.user)
+        return export_response(request, "products", product_records(qs), PRODUCT_COLUMNS)
+
+
+# GET /api/seller/orders/?status=PAID,PENDING&product=<id>  -> this seller's order lines, newest first
+class SellerOrderLineViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    permission_classes = [permissions.IsAuthenticated, IsSeller]
+    serializer_class = SellerOrderLineSerializer
+    pagination_class = SellerOrderLineCursorPagination
+
+    def get_queryset(self):
+        # served by the (seller, -id) index on OrderItem; no join through Product
+        qs = OrderItem.objects.filter(seller=self.request.user).select_related("order", "order__user")
+        status_param = self.request.query_params.get("status")
+        if status_param:
+            statuses = [s.strip().upper() for s in status_param.split(",") if s.strip()]
+            qs = qs.filter(order__status__in=[s for s in statuses if s in Order.Status.values])
+        product = self.request.query_params.get("product")
+        if product and product.isdigit():
+            qs = qs.filter(product_id=int(product))
+        return qs
@@ -1,16 +1,36 @@
 from django.contrib import admin
+from api.counting import EstimatedCountPaginator
 from .models import Category, Product
+from . import inventory
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug", "created_at")
+    list_display = ("name", "slug", "parent", "path", "created_at")
+    list_select_related = ("parent",)
     search_fields = ("name",)
+    autocomplete_fields = ("parent",)  # changing it moves the subtree (store.categories.move_category)
+    readonly_fields = ("path",)
     prepopulated_fields = {"slug": ("name",)}
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name", "category", "price", "stock", "is_active", "created_at")
-    list_filter = ("category", "is_active")
+    list_display = ("name", "category", "price", "stock", "is_active", "sharded_stock", "created_at")
+    list_filter = ("category", "is_active", "sharded_stock", "created_at")
     search_fields = ("name", "slug", "description")
     autocomplete_fields = ("category",)
+    raw_id_fields = ("owner",)
+    list_select_related = ("category",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     prepopulated_fields = {"slug": ("name",)}
+    actions = ["enable_sharded_stock", "disable_sharded_stock"]
+
+    @admin.action(description="Enable sharded stock (flash sale)")
+    def enable_sharded_stock(self, request, queryset):
+        for product in queryset:
+            inventory.enable_sharding(product)
+
+    @admin.action(description="Disable sharded stock")
+    def disable_sharded_stock(self, request, queryset):
+        for product in queryset:
+            inventory.disable_sharding(product)
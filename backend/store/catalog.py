@@ -0,0 +1,21 @@
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "store:catalog-version"
+
+
+def catalog_version() -> int:
+    # part of every cached catalog response key; bumping it orphans all of them at once.
+    # Only as shared as the default cache: with per-process LocMem (prod without REDIS_URL)
+    # other workers see the bump when their cached pages expire (CATALOG_CACHE_TTL)
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, 1, None)
+        version = cache.get(CATALOG_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version() -> None:
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 2, None)
@@ -0,0 +1,71 @@
+"""
+Category tree on materialized paths (Category.path). Subtree reads are one
+`path LIKE 'prefix%'` range on the path index; moves rewrite a subtree in one UPDATE.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Concat, Substr
+
+from api.renderers import FastJSONRenderer
+from .catalog import catalog_version, bump_catalog_version
+from .models import Category
+from .snapshots import mark_dirty
+
+TREE_KEY = "store:category-tree:{}"
+
+
+def category_tree() -> dict:
+    """
+    {"paths": {slug: path}, "json": rendered nested tree}, built once per catalog
+    version from one query. The JSON is stored pre-rendered and served as-is.
+    """
+    key = TREE_KEY.format(catalog_version())
+    tree = cache.get(key)
+    if tree is not None:
+        return tree
+
+    nodes, roots = {}, []
+    rows = list(Category.objects.order_by("path").values("id", "name", "slug", "parent_id", "path"))
+    for r in rows:  # path order: parents come before their children
+        node = {"id": r["id"], "name": r["name"], "slug": r["slug"], "children": []}
+        nodes[r["id"]] = node
+        siblings = nodes[r["parent_id"]]["children"] if r["parent_id"] in nodes else roots
+        siblings.append(node)
+    for siblings in [roots] + [n["children"] for n in nodes.values()]:
+        siblings.sort(key=lambda n: n["name"])
+
+    tree = {"paths": {r["slug"]: r["path"] for r in rows}, "json": FastJSONRenderer().render(roots)}
+    cache.set(key, tree, settings.CATALOG_CACHE_TTL)
+    return tree
+
+
+def subtree_path(slug: str) -> str | None:
+    return category_tree()["paths"].get(slug)
+
+
+def move_category(category: Category, new_parent: Category | None) -> int:
+    """
+    Re-parent `category` together with its subtree. A single UPDATE swaps the path prefix
+    of every descendant and sets the moved node's parent. Returns the number of rows rewritten.
+    """
+    with transaction.atomic():
+        old = Category.objects.filter(pk=category.pk).values_list("path", flat=True).get()
+        prefix = Category.objects.filter(pk=new_parent.pk).values_list("path", flat=True).get() if new_parent else ""
+        if prefix.startswith(old):
+            raise ValueError("A category can't be moved under itself or its descendants.")
+        new = f"{prefix}{category.pk:08d}/"
+        rows = Category.objects.filter(path__startswith=old).update(
+            path=Concat(Value(new), Substr("path", len(old) + 1), output_field=models.CharField()),
+            parent=Case(
+                When(pk=category.pk, then=Value(new_parent.pk if new_parent else None)),
+                default=F("parent"), output_field=models.BigIntegerField(),
+            ),
+        )
+    category.path, category.parent = new, new_parent
+    # queryset updates skip the post_save signal
+    bump_catalog_version()
+    # the old and new ancestors' subtrees changed; the moved category's products embed its parent
+    mark_dirty(*Category.path_ids(old), *Category.path_ids(new))
+    return rows
@@ -0,0 +1,69 @@
+import base64
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q, Max
+
+from .fastpath import product_rows
+from .models import Product, ProductTombstone
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(ts: datetime, pk: int) -> str:
+    return base64.urlsafe_b64encode(f"{ts.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        ts, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(ts), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+
+
+def changes_since(cursor: str | None, page_size: int | None = None) -> dict:
+    """
+    One page of catalog changes after `cursor`, walking the (updated_at, id) index.
+    `results` are active products (ProductSerializer shape); `removed` are ids of
+    deactivated or deleted products. Clients apply pages idempotently, so an id repeated
+    across a page boundary is harmless.
+    """
+    size = page_size or settings.CATALOG_CHANGES_PAGE_SIZE
+    qs = Product.objects.all()
+    ts = pk = None
+    if cursor:
+        ts, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(updated_at__gt=ts) | Q(updated_at=ts, id__gt=pk))
+
+    page = list(qs.order_by("updated_at", "id").values_list("id", "updated_at", "is_active")[:size + 1])
+    has_more = len(page) > size
+    page = page[:size]
+
+    active = [pid for pid, _, is_active in page if is_active]
+    removed = [pid for pid, _, is_active in page if not is_active]
+    results = product_rows(
+        Product.objects.filter(id__in=active).select_related("category").order_by("updated_at", "id")
+    ) if active else []
+
+    tombstones = ProductTombstone.objects.all()
+    if ts is not None:
+        tombstones = tombstones.filter(removed_at__gt=ts)
+    if has_more:
+        # later tombstones come with the page that reaches their timestamp
+        tombstones = tombstones.filter(removed_at__lte=page[-1][1])
+    tomb = tombstones.aggregate(last=Max("removed_at"))["last"]
+    removed += list(tombstones.values_list("product_id", flat=True).distinct())
+
+    next_ts, next_pk = (page[-1][1], page[-1][0]) if page else (ts, pk)
+    if tomb and (next_ts is None or tomb > next_ts):
+        next_ts, next_pk = tomb, 0
+
+    return {
+        "results": results,
+        "removed": removed,
+        "next": encode_cursor(next_ts, next_pk) if next_ts else cursor,
+        "has_more": has_more,
+    }
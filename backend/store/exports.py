@@ -0,0 +1,19 @@
+from api.exports import keyset_batches
+from .inventory import stock_levels
+
+PRODUCT_COLUMNS = [
+    "id", "slug", "name", "category", "price", "stock", "is_active",
+    "image_url", "popularity", "created_at", "updated_at",
+]
+_FIELDS = ("id", "slug", "name", "category__name", "price", "stock", "sharded_stock",
+           "is_active", "image_url", "popularity", "created_at", "updated_at")
+
+
+def product_records(qs, batch_size=None):
+    """Products with live stock (shards summed per batch)."""
+    for batch in keyset_batches(qs, _FIELDS, batch_size):
+        levels = stock_levels(batch)
+        for r in batch:
+            r["category"] = r["category__name"]
+            r["stock"] = levels[r["id"]]
+            yield {c: r[c] for c in PRODUCT_COLUMNS}
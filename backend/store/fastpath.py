@@ -0,0 +1,45 @@
+from rest_framework import serializers
+
+from .images import srcset
+
+# Field instances reused as plain formatters: same output as ProductSerializer/CategorySerializer,
+# without building a serializer tree per row.
+_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+_datetime = serializers.DateTimeField()
+
+PRODUCT_VALUES = (
+    "id", "name", "slug", "description", "price", "stock", "image_url", "image_variants", "is_active", "created_at",
+    "category_id", "category__name", "category__slug", "category__parent_id", "category__created_at",
+)
+
+
+def product_rows(qs) -> list[dict]:
+    """ProductSerializer(qs, many=True).data, built straight from one values() query."""
+    return format_product_rows(qs.values(*PRODUCT_VALUES))
+
+
+def format_product_rows(rows) -> list[dict]:
+    """Same as product_rows, for rows already fetched with .values(*PRODUCT_VALUES, ...)."""
+    price, dt = _price.to_representation, _datetime.to_representation
+    return [
+        {
+            "id": r["id"],
+            "name": r["name"],
+            "slug": r["slug"],
+            "description": r["description"],
+            "price": price(r["price"]),
+            "stock": r["stock"],
+            "image_url": r["image_url"],
+            "image_srcset": srcset(r["image_variants"]),
+            "is_active": r["is_active"],
+            "created_at": dt(r["created_at"]),
+            "category": {
+                "id": r["category_id"],
+                "name": r["category__name"],
+                "slug": r["category__slug"],
+                "parent": r["category__parent_id"],
+                "created_at": dt(r["category__created_at"]),
+            },
+        }
+        for r in rows
+    ]
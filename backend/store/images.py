@@ -0,0 +1,112 @@
+import hashlib
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .models import Product
+
+FORMATS = {"webp": ("WEBP", "webp"), "jpeg": ("JPEG", "jpg")}
+ALPHA_FORMATS = {"webp"}  # the rest get transparency flattened onto white
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def _check_pixels(img) -> None:
+    # header-only: runs before anything is decoded
+    width, height = img.size
+    if width * height > settings.PRODUCT_IMAGE_MAX_PIXELS:
+        raise InvalidImage(f"Image is too large ({width}x{height}); keep it under "
+                           f"{settings.PRODUCT_IMAGE_MAX_PIXELS // 1_000_000} megapixels.")
+
+
+def _store(name: str, data: bytes) -> str:
+    # names are content-addressed, so an existing file already has the right bytes
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def save_original(product: Product, upload) -> Product:
+    from PIL import Image, UnidentifiedImageError  # Pillow only loads in the upload/variant paths
+
+    data = upload.read()
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            _check_pixels(img)
+            img.verify()
+            fmt = (img.format or "").lower()
+    except Image.DecompressionBombError as e:
+        raise InvalidImage("Image is too large.") from e
+    except (UnidentifiedImageError, OSError) as e:
+        raise InvalidImage("Upload a JPEG, PNG or WebP image.") from e
+    if fmt not in ("jpeg", "png", "webp"):
+        raise InvalidImage("Upload a JPEG, PNG or WebP image.")
+
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    ext = "jpg" if fmt == "jpeg" else fmt
+    product.image.name = _store(f"products/originals/{digest}.{ext}", data)
+    product.image_variants = {}
+    product.save(update_fields=["image", "image_variants", "updated_at"])
+    return product
+
+
+def build_variants(product: Product) -> dict:
+    """Resize the original to PRODUCT_IMAGE_WIDTHS in every format in FORMATS; names reuse the original's hash."""
+    from PIL import Image, ImageOps
+
+    digest = os.path.splitext(os.path.basename(product.image.name))[0]
+    with default_storage.open(product.image.name, "rb") as fh:
+        try:
+            img = Image.open(fh)
+        except Image.DecompressionBombError as e:
+            raise InvalidImage("Image is too large.") from e
+        _check_pixels(img)  # originals saved before the limit existed
+        img = ImageOps.exif_transpose(img)
+        img.load()
+
+    has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+    if has_alpha:
+        opaque = img.convert("RGBA")
+        flat = Image.new("RGB", opaque.size, "white")
+        flat.paste(opaque, mask=opaque.getchannel("A"))
+        sources = {key: opaque if key in ALPHA_FORMATS else flat for key in FORMATS}
+    else:
+        rgb = img if img.mode in ("RGB", "L") else img.convert("RGB")
+        sources = {key: rgb for key in FORMATS}
+
+    variants = {key: {} for key in FORMATS}
+    for width in sorted({min(w, img.width) for w in settings.PRODUCT_IMAGE_WIDTHS}):
+        height = max(1, round(img.height * width / img.width))
+        resized = {}
+        for key, (pil_format, ext) in FORMATS.items():
+            src = sources[key]
+            if id(src) not in resized:
+                resized[id(src)] = src if width == src.width else src.resize((width, height), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            resized[id(src)].save(buf, pil_format, quality=settings.PRODUCT_IMAGE_QUALITY, optimize=True)
+            variants[key][str(width)] = _store(f"products/{digest}-{width}.{ext}", buf.getvalue())
+
+    product.image_variants = variants
+    product.save(update_fields=["image_variants", "updated_at"])
+    return variants
+
+
+def media_url(name: str) -> str:
+    # the storefront and seller portal run on other origins, so relative /media/ URLs won't do
+    url = default_storage.url(name)
+    if "://" in url or not settings.MEDIA_BASE_URL:
+        return url
+    return settings.MEDIA_BASE_URL.rstrip("/") + "/" + url.lstrip("/")
+
+
+def srcset(variants: dict) -> dict:
+    """{"webp": "<url> 320w, <url> 640w", "jpeg": "..."} for <picture>/<img srcset>."""
+    return {
+        key: ", ".join(f"{media_url(name)} {w}w" for w, name in sorted(sizes.items(), key=lambda i: int(i[0])))
+        for key, sizes in (variants or {}).items()
+    }
@@ -0,0 +1,112 @@
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+
+from .models import Product, StockShard
+
+
+def _split(total: int, n: int) -> list[int]:
+    base, extra = divmod(total, n)
+    return [base + (1 if i < extra else 0) for i in range(n)]
+
+
+def stock_levels(rows) -> dict:
+    """
+    rows: iterable of {"id", "stock", "sharded_stock"} dicts.
+    Returns {product_id: stock}, summing shards for sharded products (one extra query).
+    """
+    levels = {}
+    sharded = []
+    for r in rows:
+        levels[r["id"]] = r["stock"]
+        if r["sharded_stock"]:
+            sharded.append(r["id"])
+    if sharded:
+        totals = (StockShard.objects.filter(product_id__in=sharded)
+                  .values("product_id").annotate(total=Sum("stock")).order_by())
+        for t in totals:
+            levels[t["product_id"]] = t["total"] or 0
+    return levels
+
+
+def available_stock(product: Product) -> int:
+    if not product.sharded_stock:
+        return product.stock
+    return StockShard.objects.filter(product=product).aggregate(total=Sum("stock"))["total"] or 0
+
+
+def enable_sharding(product: Product, shards: int | None = None) -> None:
+    shards = shards or settings.STOCK_SHARDS
+    with transaction.atomic():
+        p = Product.objects.select_for_update().get(pk=product.pk)
+        if p.sharded_stock:
+            return
+        StockShard.objects.bulk_create([
+            StockShard(product=p, shard=i, stock=s) for i, s in enumerate(_split(p.stock, shards))
+        ])
+        p.sharded_stock = True
+        p.save(update_fields=["sharded_stock"])
+    product.sharded_stock = True
+
+
+def disable_sharding(product: Product) -> None:
+    with transaction.atomic():
+        p = Product.objects.select_for_update().get(pk=product.pk)
+        if not p.sharded_stock:
+            return
+        shards = list(StockShard.objects.select_for_update().filter(product=p).order_by("shard"))
+        p.stock = sum(s.stock for s in shards)
+        p.sharded_stock = False
+        p.save(update_fields=["stock", "sharded_stock"])
+        StockShard.objects.filter(product=p).delete()
+    product.stock, product.sharded_stock = p.stock, False
+
+
+def set_stock(product: Product, total: int) -> None:
+    # seller edits: spread the new total evenly over the existing shards
+    with transaction.atomic():
+        shards = list(StockShard.objects.select_for_update().filter(product=product).order_by("shard"))
+        for s, v in zip(shards, _split(total, len(shards))):
+            s.stock = v
+        StockShard.objects.bulk_update(shards, ["stock"])
+        Product.objects.filter(pk=product.pk).update(stock=total)
+
+
+def rebalance(product: Product) -> int:
+    """Evens out drained shards and refreshes Product.stock (the display snapshot)."""
+    with transaction.atomic():
+        shards = list(StockShard.objects.select_for_update().filter(product=product).order_by("shard"))
+        total = sum(s.stock for s in shards)
+        for s, v in zip(shards, _split(total, len(shards))):
+            s.stock = v
+        StockShard.objects.bulk_update(shards, ["stock"])
+        Product.objects.filter(pk=product.pk).update(stock=total)
+    return total
+
+
+def take_from_shards(product: Product, qty: int) -> None:
+    """
+    Decrement `qty` units of a sharded product. Call inside the checkout transaction.
+    Raises ValueError when the shards together don't hold enough stock.
+    """
+    candidates = list(StockShard.objects.filter(product=product, stock__gte=qty).values_list("id", flat=True))
+    random.shuffle(candidates)
+    for shard_id in candidates:
+        # conditional decrement: only ever locks the one shard row, and can't go negative
+        if StockShard.objects.filter(pk=shard_id, stock__gte=qty).update(stock=F("stock") - qty):
+            return
+
+    # no single shard is big enough: lock them all (fixed order) and drain across shards
+    shards = list(StockShard.objects.select_for_update().filter(product=product).order_by("shard"))
+    if sum(s.stock for s in shards) < qty:
+        raise ValueError(f"Not enough stock for {product.name}.")
+    remaining = qty
+    for s in shards:
+        take = min(s.stock, remaining)
+        s.stock -= take
+        remaining -= take
+        if not remaining:
+            break
+    StockShard.objects.bulk_update(shards, ["stock"])
@@ -0,0 +1,39 @@
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.recommendations import compute_neighbors
+
+
+class Command(BaseCommand):
+    help = "Benchmark the co-occurrence rebuild (matrix + top-K) on synthetic baskets; no database access."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=2_000_000, help="Order lines")
+        parser.add_argument("--products", type=int, default=50_000)
+        parser.add_argument("--basket", type=int, default=3, help="Average lines per order")
+        parser.add_argument("--top-k", dest="top_k", type=int, default=settings.RELATED_PRODUCTS_TOP_K)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        import numpy as np
+
+        rng = np.random.default_rng(options["seed"])
+        n = options["lines"]
+        order_ids = np.sort(rng.integers(0, max(1, n // options["basket"]), size=n))
+        # Zipf-ish popularity so a few products co-occur with many others, like a real catalog
+        product_ids = (rng.zipf(1.3, size=n) - 1) % options["products"]
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        src, _, _, _ = compute_neighbors(order_ids, product_ids, options["top_k"])
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{n:,} order lines, {options['products']:,} products: rebuilt {len(src):,} links "
+            f"in {elapsed:.2f}s, peak memory {peak / 2**20:.1f} MiB"
+        ))
@@ -0,0 +1,93 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, DatabaseError
+
+from cart.models import Cart, CartItem
+from orders.models import Order
+from orders.services import convert_cart_to_order
+from store import inventory
+from store.models import Category, Product
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency benchmark: many buyers checking out one hot product, single-row stock "
+        "vs sharded stock. Writes throwaway bench-* rows to the configured database "
+        "(meaningful numbers need PostgreSQL; sqlite serializes all writers)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument("--checkouts", type=int, default=50, help="Checkouts per thread")
+        parser.add_argument("--stock", type=int, default=500, help="Initial stock (less than threads*checkouts tests sell-out)")
+        parser.add_argument("--shards", type=int, default=8)
+
+    def handle(self, *args, **opts):
+        if connection.vendor == "sqlite" and opts["threads"] > 1:
+            self.stdout.write(self.style.WARNING("sqlite: results only check correctness, not throughput."))
+
+        for mode in ("single-row", "sharded"):
+            self.run(mode, opts)
+
+    def run(self, mode, opts):
+        threads, per_thread = opts["threads"], opts["checkouts"]
+        cat, _ = Category.objects.get_or_create(name="bench-category")
+        product = Product.objects.create(
+            category=cat, name=f"bench-{mode}", price=Decimal("1.00"), stock=opts["stock"],
+        )
+        if mode == "sharded":
+            inventory.enable_sharding(product, opts["shards"])
+        users = [User.objects.create(username=f"bench-{mode}-{product.id}-{i}") for i in range(threads)]
+
+        stats = {"ok": 0, "sold_out": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def buyer(user):
+            cart, _ = Cart.objects.get_or_create(user=user)
+            try:
+                for _ in range(per_thread):
+                    CartItem.objects.get_or_create(cart=cart, product=product, defaults={"quantity": 1})
+                    try:
+                        convert_cart_to_order(user)
+                        key = "ok"
+                    except ValueError:
+                        key = "sold_out"
+                    except DatabaseError:
+                        key = "errors"
+                    with lock:
+                        stats[key] += 1
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=buyer, args=(u,)) for u in users]
+        started = time.perf_counter()
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started
+
+        product.refresh_from_db()
+        final = inventory.available_stock(product)
+        sold = sum(o.items.get().quantity for o in Order.objects.filter(user__in=users).prefetch_related("items"))
+        oversold = final < 0 or opts["stock"] - final != sold
+
+        self.stdout.write(
+            f"{mode:>10}: {stats['ok']} orders in {elapsed:.2f}s "
+            f"({stats['ok'] / elapsed:.1f} orders/s), sold out {stats['sold_out']}, "
+            f"db errors {stats['errors']}, stock {opts['stock']} -> {final}"
+        )
+        if oversold:
+            self.stdout.write(self.style.ERROR(f"{mode}: OVERSOLD (sold {sold}, stock left {final})"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{mode}: no overselling (sold {sold})"))
+
+        Order.objects.filter(user__in=users).delete()
+        User.objects.filter(pk__in=[u.pk for u in users]).delete()
+        product.delete()
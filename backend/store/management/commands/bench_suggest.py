@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.suggest import PrefixIndex, pack, unpack
+
+WORDS = (
+    "wireless bluetooth usb cable charger fast portable smart led lamp desk office chair ergonomic "
+    "steel bottle water insulated kitchen knife set ceramic pan nonstick cotton shirt slim fit denim "
+    "jacket leather wallet travel bag backpack laptop stand phone case screen protector gaming mouse "
+    "keyboard mechanical headphones noise cancelling speaker mini organic green tea coffee beans yoga "
+    "mat running shoes kids toy puzzle garden hose tool kit drill battery pack camera tripod"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Benchmark the suggest prefix index (build, memory, lookups, incremental updates) on synthetic names; no database access."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1_000_000)
+        parser.add_argument("--lookups", type=int, default=20_000)
+        parser.add_argument("--updates", type=int, default=1_000, help="Products changed incrementally before the lookup round")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        n = options["products"]
+
+        def name(i):
+            return " ".join(rng.choices(WORDS, k=rng.randint(2, 5))) + f" {i}"
+
+        rows = [(i, name(i), f"p-{i}") for i in range(1, n + 1)]
+
+        started = time.perf_counter()
+        index = PrefixIndex(rows)
+        build = time.perf_counter() - started
+        del rows
+
+        started = time.perf_counter()
+        blob = pack(index)
+        index = unpack(blob)
+        transfer = time.perf_counter() - started
+
+        changed = set(rng.sample(range(1, n + 1), min(options["updates"], n)))
+        started = time.perf_counter()
+        index.apply(changed, [(pk, name(pk), f"p-{pk}") for pk in changed])
+        update = time.perf_counter() - started
+
+        prefixes = []
+        for _ in range(options["lookups"]):
+            words = rng.choices(WORDS, k=rng.randint(1, 2))
+            text = " ".join(words)
+            prefixes.append(text[:rng.randint(settings.SUGGEST_MIN_PREFIX, len(text))])
+        timings = []
+        hits = 0
+        for prefix in prefixes:
+            started = time.perf_counter()
+            hits += len(index.lookup(prefix, settings.SUGGEST_LIMIT))
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+
+        def us(q):
+            return timings[min(len(timings) - 1, int(q * len(timings)))] * 1e6
+
+        self.stdout.write(
+            f"{n:,} products: built in {build:.1f}s, {index.nbytes() / 2**20:.0f} MiB held per worker, "
+            f"{len(blob) / 2**20:.0f} MiB packed for the cache ({transfer:.2f}s pack+unpack)"
+        )
+        self.stdout.write(f"{len(changed):,} incremental updates applied in {update * 1e3:.1f}ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(timings):,} lookups ({hits / len(timings):.1f} results avg): "
+            f"p50 {us(0.5):.0f}us, p99 {us(0.99):.0f}us, max {timings[-1] * 1e6:.0f}us"
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from store.snapshots import build_snapshots
+
+
+class Command(BaseCommand):
+    help = "Write content-hashed catalog JSON snapshots into STATIC_ROOT (served by WhiteNoise) and refresh the manifest."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dirty-only", dest="dirty_only", action="store_true",
+                            help="Only rebuild categories whose products changed since the last build")
+
+    def handle(self, *args, **options):
+        stats = build_snapshots(full=not options["dirty_only"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshots: {stats['categories']} categories, {stats['written']} pages written, "
+            f"{stats['unchanged']} unchanged, {stats['removed']} removed."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from store.suggest import build_indexes, pack, shared_cache
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product/category prefix index behind /api/products/suggest/ and publish it to SUGGEST_CACHE."
+
+    def handle(self, *args, **options):
+        products, categories, since = build_indexes()
+        where = "published" if shared_cache() is not None else "not published (no SUGGEST_CACHE)"
+        self.stdout.write(self.style.SUCCESS(
+            f"Suggest index: {len(products):,} products, {len(categories):,} categories as of {since:%H:%M:%S}, "
+            f"{len(pack((products, categories, since))) / 2**20:.1f} MiB packed, {where}."
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from store.categories import move_category
+from store.models import Category
+
+
+class Command(BaseCommand):
+    help = "Re-parent categories (with their subtrees) under --to <slug>, or to the top level with --to ''."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="+")
+        parser.add_argument("--to", required=True, help="slug of the new parent; empty for top level")
+
+    def handle(self, *args, **options):
+        parent = None
+        if options["to"]:
+            parent = Category.objects.filter(slug=options["to"]).first()
+            if parent is None:
+                raise CommandError(f"No category {options['to']!r}.")
+        for slug in options["slugs"]:
+            category = Category.objects.filter(slug=slug).first()
+            if category is None:
+                raise CommandError(f"No category {slug!r}.")
+            try:
+                rows = move_category(category, parent)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"  {slug}: {rows} categories now under {options['to'] or 'the top level'}")
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.recommendations import rebuild_related_products
+
+
+class Command(BaseCommand):
+    help = "Rebuild the 'frequently bought together' table from all order lines (sparse co-occurrence matrix)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", dest="top_k", type=int, default=None)
+
+    def handle(self, *args, **options):
+        stats = rebuild_related_products(options["top_k"])
+        self.stdout.write(self.style.SUCCESS(f"Built {stats['links']} links from {stats['order_lines']} order lines."))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Concat, LPad, Cast
+
+
+def fill_root_paths(apps, schema_editor):
+    # every existing category becomes a root: path = zero-padded id + "/"
+    Category = apps.get_model("store", "Category")
+    Category.objects.update(
+        path=Concat(LPad(Cast("id", models.CharField()), 8, Value("0")), Value("/"), output_field=models.CharField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_product_popularity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='children', to='store.category'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_root_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['path'], name='store_category_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
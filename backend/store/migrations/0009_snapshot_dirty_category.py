@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-19 12:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_category_tree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotDirtyCategory',
+            fields=[
+                ('category_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('marked_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
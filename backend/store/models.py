@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.text import slugify
 from django.conf import settings
@@ -5,10 +6,18 @@ from django.conf import settings
 class Category(models.Model):
     name = models.CharField(max_length=200, unique=True)
     slug = models.SlugField(max_length=220, unique=True, blank=True)
+    parent = models.ForeignKey("self", null=True, blank=True, on_delete=models.PROTECT, related_name="children")
+    # materialized path: one zero-padded id segment per ancestor, then self ("00000001/00000004/");
+    # a subtree is every row whose path starts with the root's path (store.categories)
+    path = models.CharField(max_length=255, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["name"]
+        indexes = [
+            # varchar_pattern_ops so PostgreSQL serves `path LIKE 'prefix%'` from the index
+            models.Index(fields=["path"], name="store_category_path_idx", opclasses=["varchar_pattern_ops"]),
+        ]
 
     def __str__(self):
         return self.name
@@ -16,7 +25,31 @@ class Category(models.Model):
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
+        if self.pk and self.path and self.parent_id != self.path_parent_id():
+            from .categories import move_category  # rewrites the whole subtree in one UPDATE
+            move_category(self, self.parent)
         super().save(*args, **kwargs)
+        if not self.path:
+            self.path = self.build_path(self.pk, self.parent_id)
+            Category.objects.filter(pk=self.pk).update(path=self.path)
+
+    def clean(self):
+        if self.pk and self.parent_id and self.path and self.parent.path.startswith(self.path):
+            raise ValidationError({"parent": "A category can't be moved under itself or its descendants."})
+
+    def path_parent_id(self):
+        segments = self.path.rstrip("/").split("/")
+        return int(segments[-2]) if len(segments) > 1 else None
+
+    @staticmethod
+    def path_ids(path: str) -> list[int]:
+        """Ancestor ids, root first, then the category itself."""
+        return [int(segment) for segment in path.split("/") if segment]
+
+    @staticmethod
+    def build_path(pk, parent_id) -> str:
+        prefix = Category.objects.filter(pk=parent_id).values_list("path", flat=True).first() if parent_id else ""
+        return f"{prefix}{pk:08d}/"
 
 
 class Product(models.Model):
@@ -33,13 +66,23 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
-    image_url = models.URLField(blank=True)  # simple for now (we can switch to ImageField later)
+    image_url = models.URLField(blank=True)  # external image; uploads below take precedence in clients
+    image = models.FileField(upload_to="products/originals/", blank=True)  # content-addressed name, see store.images
+    image_variants = models.JSONField(default=dict, blank=True)  # {"webp": {"320": "products/<hash>-320.webp"}, ...}
     is_active = models.BooleanField(default=True)
+    sharded_stock = models.BooleanField(default=False)  # flash-sale mode: stock lives in StockShard rows
+    popularity = models.FloatField(default=0)  # time-decayed units sold, see store.popularity
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # not bumped by stock-only saves; drives /products/changes/
 
     class Meta:
         ordering = ["-created_at"]
-        indexes = [models.Index(fields=["slug"]), models.Index(fields=["-created_at"])]
+        indexes = [
+            models.Index(fields=["slug"]),
+            models.Index(fields=["-created_at"]),
+            models.Index(fields=["updated_at", "id"]),
+            models.Index(fields=["-popularity", "-id"]),
+        ]
 
     def __str__(self):
         return self.name
@@ -54,3 +97,60 @@ class Product(models.Model):
                 candidate = f"{base}-{n}"
             self.slug = candidate
         super().save(*args, **kwargs)
+
+
+# one slice of a hot product's stock; checkout decrements a random shard
+# instead of locking the Product row
+class StockShard(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_shards")
+    shard = models.PositiveSmallIntegerField()
+    stock = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = (("product", "shard"),)
+
+    def __str__(self):
+        return f"{self.product_id}#{self.shard}: {self.stock}"
+
+
+# deleted products, so delta-sync clients can drop them (deactivation shows up via updated_at)
+class ProductTombstone(models.Model):
+    product_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=240)
+    removed_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.slug} (removed {self.removed_at:%Y-%m-%d})"
+
+
+# categories whose catalog snapshot needs rebuilding (store.snapshots); kept in the database
+# so the beat/worker process sees flags set by any web worker
+class SnapshotDirtyCategory(models.Model):
+    category_id = models.BigIntegerField(primary_key=True)
+    marked_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"category {self.category_id} (dirty since {self.marked_at:%Y-%m-%d %H:%M})"
+
+
+# precomputed "frequently bought together": top-K co-purchased products per product
+class RelatedProduct(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="related_links")
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="related_to")
+    score = models.FloatField()  # number of orders containing both
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        unique_together = (("product", "related"),)
+        indexes = [models.Index(fields=["product", "rank"])]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} (#{self.rank})"
+
+
+# single row: the reference time popularity scores are currently expressed against
+class PopularityEpoch(models.Model):
+    epoch = models.DateTimeField()
+
+    def __str__(self):
+        return f"popularity epoch {self.epoch:%Y-%m-%d %H:%M}"
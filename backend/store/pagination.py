@@ -0,0 +1,8 @@
+from api.pagination import CountedCursorPagination
+
+
+class ProductCursorPagination(CountedCursorPagination):
+    """Keyset pagination over the view's current sort: (-created_at, -id) or (-popularity, -id), both indexed."""
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_ordering()
@@ -0,0 +1,51 @@
+"""
+Exponentially time-decayed popularity.
+
+A sale of q units at time t is worth q * 2 ** ((t - epoch) / half_life), i.e. new
+sales are inflated instead of old ones being decayed, so every product's score
+shrinks at the same rate and the stored ordering stays correct without rewriting
+rows. `renormalize()` periodically rescales everything to a fresh epoch so the
+numbers stay small.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Product, PopularityEpoch
+
+
+def _epoch(lock: bool = False) -> PopularityEpoch:
+    qs = PopularityEpoch.objects.select_for_update() if lock else PopularityEpoch.objects
+    row = qs.order_by("pk").first()
+    if row is None:
+        row, _ = PopularityEpoch.objects.get_or_create(pk=1, defaults={"epoch": timezone.now()})
+    return row
+
+
+def _weight(at, epoch) -> float:
+    half_life = settings.POPULARITY_HALF_LIFE_DAYS * 86400
+    return 2 ** ((at - epoch).total_seconds() / half_life)
+
+
+def record_sales(lines, at=None) -> None:
+    """lines: iterable of (product_id, quantity). Atomic F() increments, in product id order."""
+    weight = _weight(at or timezone.now(), _epoch().epoch)
+    totals = {}
+    for product_id, qty in lines:
+        totals[product_id] = totals.get(product_id, 0) + qty
+    with transaction.atomic():
+        for product_id in sorted(totals):
+            Product.objects.filter(pk=product_id).update(popularity=F("popularity") + totals[product_id] * weight)
+
+
+def renormalize() -> float:
+    """Move the epoch to now and rescale every score in one statement; returns the factor applied."""
+    with transaction.atomic():
+        row = _epoch(lock=True)
+        now = timezone.now()
+        factor = 1 / _weight(now, row.epoch)
+        Product.objects.filter(popularity__gt=0).update(popularity=F("popularity") * factor)
+        row.epoch = now
+        row.save(update_fields=["epoch"])
+    return factor
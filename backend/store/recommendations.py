@@ -0,0 +1,104 @@
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import RelatedProduct
+
+
+def compute_neighbors(order_ids, product_ids, top_k: int):
+    """
+    order_ids/product_ids: parallel int arrays, one entry per order line.
+    Builds the sparse order x product basket matrix B and the item-item
+    co-occurrence matrix C = B^T B, then keeps the top_k neighbours per product.
+    Returns (product, related, score, rank) arrays.
+    """
+    import numpy as np  # heavy imports stay out of the web process until a rebuild runs
+    from scipy import sparse
+
+    orders, order_idx = np.unique(order_ids, return_inverse=True)
+    products, product_idx = np.unique(product_ids, return_inverse=True)
+    basket = sparse.csr_matrix(
+        (np.ones(len(order_idx), dtype=np.float32), (order_idx, product_idx)),
+        shape=(len(orders), len(products)),
+    )
+    basket.data[:] = 1  # the same product twice in one order counts once
+
+    co = (basket.T @ basket).tocsr()
+    co.setdiag(0)
+    co.eliminate_zeros()
+
+    src, dst, score, rank = [], [], [], []
+    indptr, indices, data = co.indptr, co.indices, co.data
+    for row in range(co.shape[0]):
+        lo, hi = indptr[row], indptr[row + 1]
+        if lo == hi:
+            continue
+        cols, vals = indices[lo:hi], data[lo:hi]
+        if hi - lo > top_k:
+            keep = np.argpartition(-vals, top_k - 1)[:top_k]
+            cols, vals = cols[keep], vals[keep]
+        order = np.lexsort((products[cols], -vals))  # score desc, then product id for stable ranks
+        n = len(order)
+        src.append(np.full(n, products[row]))
+        dst.append(products[cols[order]])
+        score.append(vals[order])
+        rank.append(np.arange(n))
+
+    if not src:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=np.float32), empty
+    return np.concatenate(src), np.concatenate(dst), np.concatenate(score), np.concatenate(rank)
+
+
+def rebuild_related_products(top_k: int | None = None) -> dict:
+    """Full rebuild from every order line (live and archived orders)."""
+    import numpy as np
+    from orders.models import OrderItem, ArchivedOrderItem
+
+    top_k = top_k or settings.RELATED_PRODUCTS_TOP_K
+    lines = chain(
+        OrderItem.objects.order_by().values_list("order_id", "product_id").iterator(chunk_size=10000),
+        ArchivedOrderItem.objects.order_by().values_list("order_id", "product_id").iterator(chunk_size=10000),
+    )
+    pairs = np.fromiter(chain.from_iterable(lines), dtype=np.int64).reshape(-1, 2)
+    src, dst, score, rank = compute_neighbors(pairs[:, 0], pairs[:, 1], top_k)
+
+    with transaction.atomic():
+        RelatedProduct.objects.all().delete()
+        RelatedProduct.objects.bulk_create(
+            (RelatedProduct(product_id=int(s), related_id=int(d), score=float(v), rank=int(r))
+             for s, d, v, r in zip(src, dst, score, rank)),
+            batch_size=2000,
+        )
+    return {"order_lines": len(pairs), "links": len(src)}
+
+
+def fold_order(product_ids, top_k: int | None = None) -> None:
+    """
+    Incrementally add one order's basket: +1 for every ordered pair, then re-rank and trim.
+    Pairs outside a product's current top-K start from 1 here; the periodic rebuild fixes that drift.
+    """
+    top_k = top_k or settings.RELATED_PRODUCTS_TOP_K
+    ids = sorted(set(product_ids))
+    if len(ids) < 2:
+        return
+    with transaction.atomic():
+        for pid in ids:
+            links = {r.related_id: r for r in RelatedProduct.objects.select_for_update().filter(product_id=pid)}
+            for other in ids:
+                if other == pid:
+                    continue
+                if other in links:
+                    links[other].score += 1
+                else:
+                    links[other] = RelatedProduct(product_id=pid, related_id=other, score=1, rank=0)
+
+            ranked = sorted(links.values(), key=lambda r: (-r.score, r.related_id))
+            for rank, link in enumerate(ranked[:top_k]):
+                link.rank = rank
+            dropped = [r.pk for r in ranked[top_k:] if r.pk]
+            if dropped:
+                RelatedProduct.objects.filter(pk__in=dropped).delete()
+            RelatedProduct.objects.bulk_update([r for r in ranked[:top_k] if r.pk], ["score", "rank"])
+            RelatedProduct.objects.bulk_create([r for r in ranked[:top_k] if not r.pk])
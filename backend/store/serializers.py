@@ -1,18 +1,23 @@
 from rest_framework import serializers
 from .models import Category, Product
+from .images import srcset
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ["id", "name", "slug", "created_at"]
+        fields = ["id", "name", "slug", "parent", "created_at"]
 
 class ProductSerializer(serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             "id", "name", "slug", "description",
-            "price", "stock", "image_url", "is_active",
+            "price", "stock", "image_url", "image_srcset", "is_active",
             "created_at", "category",
         ]
+
+    def get_image_srcset(self, obj):
+        return srcset(obj.image_variants)
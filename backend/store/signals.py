@@ -0,0 +1,38 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .models import Category, Product, ProductTombstone
+from .snapshots import mark_dirty
+
+# stock-only saves (checkout) don't invalidate cached catalog pages;
+# clients read live stock from /api/products/availability/
+STOCK_ONLY = frozenset({"stock"})
+
+
+@receiver(pre_save, sender=Product)
+def product_moving(sender, instance, update_fields=None, **kwargs):
+    # a product changing category dirties the snapshot of the category it leaves
+    if instance.pk and (update_fields is None or "category" in update_fields):
+        old = Product.objects.filter(pk=instance.pk).values_list("category_id", flat=True).first()
+        if old and old != instance.category_id:
+            mark_dirty(old)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+def catalog_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields and frozenset(update_fields) <= STOCK_ONLY:
+        return
+    bump_catalog_version()
+    mark_dirty(instance.category_id if sender is Product else instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+def catalog_deleted(sender, instance, **kwargs):
+    bump_catalog_version()
+    if sender is Product:
+        mark_dirty(instance.category_id)
+        ProductTombstone.objects.create(product_id=instance.pk, slug=instance.slug, removed_at=timezone.now())
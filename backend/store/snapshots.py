@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from api.renderers import FastJSONRenderer
+from .fastpath import product_rows
+from .models import Category, Product, SnapshotDirtyCategory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_CACHE_KEY = "store:snapshot-manifest"
+
+
+def snapshot_root() -> Path:
+    return Path(settings.STATIC_ROOT) / settings.CATALOG_SNAPSHOT_DIR
+
+
+def mark_dirty(*category_ids) -> None:
+    """Flag the categories and their ancestors: a category's snapshot covers its whole subtree."""
+    ids = {cid for cid in category_ids if cid}
+    if not ids:
+        return
+    for path in Category.objects.filter(id__in=ids).values_list("path", flat=True):
+        ids.update(Category.path_ids(path))
+    SnapshotDirtyCategory.objects.bulk_create(
+        [SnapshotDirtyCategory(category_id=cid) for cid in ids], ignore_conflicts=True,
+    )
+
+
+def _write(path: Path, body: bytes) -> None:
+    # precompressed siblings are picked up by WhiteNoise's content negotiation
+    path.parent.mkdir(parents=True, exist_ok=True)
+    variants = {"": body, ".gz": gzip.compress(body, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(body)
+    for suffix, data in variants.items():
+        tmp = path.with_name(path.name + suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path.with_name(path.name + suffix))
+
+
+def load_manifest() -> dict:
+    manifest = cache.get(MANIFEST_CACHE_KEY)
+    if manifest is None:
+        try:
+            manifest = json.loads((snapshot_root() / "manifest.json").read_text())
+        except (OSError, ValueError):
+            manifest = {"generated_at": None, "categories": {}}
+        cache.set(MANIFEST_CACHE_KEY, manifest, settings.CATALOG_SNAPSHOT_MANIFEST_TTL)
+    return manifest
+
+
+def build_snapshots(full: bool = False) -> dict:
+    """
+    Write each category's active products (its subtree's, like ?category=) as content-hashed JSON pages under
+    STATIC_ROOT/<CATALOG_SNAPSHOT_DIR>/ and refresh manifest.json.
+    Only dirty categories are re-read unless `full`; unchanged pages keep their file (same hash).
+    """
+    root = snapshot_root()
+    manifest = load_manifest()
+    previous = manifest["categories"]
+    categories = {c.id: c for c in Category.objects.all()}
+
+    flags = set(SnapshotDirtyCategory.objects.values_list("category_id", flat=True))
+    todo = list(categories) if full else [cid for cid in categories if cid in flags]
+    # clear flags before reading so edits made during the build mark the category again;
+    # flags of deleted categories go too
+    SnapshotDirtyCategory.objects.filter(category_id__in=(flags - set(categories)) | set(todo)).delete()
+
+    renderer = FastJSONRenderer()
+    static_url = settings.STATIC_URL + settings.CATALOG_SNAPSHOT_DIR + "/"
+    size = settings.CATALOG_SNAPSHOT_PAGE_SIZE
+    stats = {"categories": len(todo), "written": 0, "unchanged": 0, "removed": 0}
+    categories_out = {slug: entry for slug, entry in previous.items()
+                      if slug in {c.slug for c in categories.values()}}
+
+    for cid in todo:
+        cat = categories[cid]
+        # same rows as /api/products/?category=<slug>: the whole subtree
+        qs = (Product.objects.filter(is_active=True, category__path__startswith=cat.path)
+              .select_related("category").order_by("-created_at"))
+        rows = product_rows(qs)
+        names = []
+        for n, start in enumerate(range(0, len(rows), size), 1):
+            body = renderer.render(rows[start:start + size])
+            name = f"{cat.slug}/page-{n}.{hashlib.sha256(body).hexdigest()[:12]}.json"
+            if (root / name).exists():
+                stats["unchanged"] += 1
+            else:
+                _write(root / name, body)
+                stats["written"] += 1
+            names.append(name)
+
+        # keep the previous generation around for clients holding the old manifest
+        keep = set(names) | set(previous.get(cat.slug, {}).get("files", []))
+        for path in (root / cat.slug).glob("page-*.json"):
+            if f"{cat.slug}/{path.name}" not in keep:
+                for suffix in ("", ".gz", ".br"):
+                    path.with_name(path.name + suffix).unlink(missing_ok=True)
+                stats["removed"] += 1
+
+        categories_out[cat.slug] = {
+            "name": cat.name,
+            "count": len(rows),
+            "files": names,
+            "pages": [static_url + name for name in names],
+        }
+
+    manifest = {"generated_at": timezone.now().isoformat(), "page_size": size, "categories": categories_out}
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / "manifest.json.tmp"
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, root / "manifest.json")
+    cache.set(MANIFEST_CACHE_KEY, manifest, settings.CATALOG_SNAPSHOT_MANIFEST_TTL)
+    return stats
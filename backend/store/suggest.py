@@ -0,0 +1,297 @@
+"""
+Search-as-you-type for /api/products/suggest/.
+
+A PrefixIndex is a sorted array of terms, one per word start of each name ("usb c
+cable" -> "usb c cable", "c cable", "cable"), searched with bisect and a short forward
+scan. Terms, names and offsets live in a few flat strings and arrays rather than
+millions of small Python objects (about 8 bytes per term plus the text itself).
+
+Every worker holds its own copy. The base is built from the database in a background
+thread (never inside a request; suggestions are empty until the first build lands) and
+rebuilt every SUGGEST_REBUILD_INTERVAL. Between rebuilds a worker polls the database for
+products changed since its base, using the same (updated_at, id) index and tombstones as
+/api/products/changes/, so edits made through any process show up within
+SUGGEST_POLL_INTERVAL: changed ids are masked in the base arrays and their new terms go
+into a small sorted overlay until the next rebuild folds them in.
+
+With SUGGEST_CACHE pointing at a shared cache (Redis; the packed index is tens of MB, too
+big for memcached), one worker builds and publishes the base and the others load it
+instead of each reading the whole catalog.
+"""
+import bisect
+import heapq
+import logging
+import pickle
+import re
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
+
+from .models import Category, Product, ProductTombstone
+
+logger = logging.getLogger(__name__)
+
+# keys in the shared SUGGEST_CACHE, when there is one
+INDEX_KEY = "store:suggest-index"          # published base: packed (products, categories, since)
+BUILT_KEY = "store:suggest-built"          # `since` of the published base, as a version token
+BUILD_LOCK_KEY = "store:suggest-build-lock"
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(text: str) -> list[str]:
+    """Lowercase words with accents stripped, so "Café" is found by "cafe"."""
+    text = text.casefold()
+    if not text.isascii():
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return WORD.findall(text)
+
+
+def terms_for(name: str, chars: int, max_words: int) -> set[str]:
+    words = normalize(name)
+    return {" ".join(words[i:])[:chars] for i in range(min(len(words), max_words))}
+
+
+class PrefixIndex:
+    def __init__(self, rows=()):
+        """rows: iterable of (id, name, slug)."""
+        self._chars, self._max_words = settings.SUGGEST_TERM_CHARS, settings.SUGGEST_MAX_WORDS
+        doc_text, doc_off, doc_id, entries = [], array("I", [0]), array("q"), []
+        pos = 0
+        for ordinal, (pk, name, slug) in enumerate(rows):
+            text = f"{name}\t{slug}"
+            doc_text.append(text)
+            pos += len(text)
+            doc_off.append(pos)
+            doc_id.append(pk)
+            entries.extend((term, ordinal) for term in terms_for(name, self._chars, self._max_words))
+        entries.sort()
+
+        self._doc_text, self._doc_off, self._doc_id = "".join(doc_text), doc_off, doc_id
+        term_off, term_doc, pos = array("I", [0]), array("I"), 0
+        for term, ordinal in entries:
+            pos += len(term)
+            term_off.append(pos)
+            term_doc.append(ordinal)
+        self._term_text = "".join(term for term, _ in entries)
+        self._term_off, self._term_doc = term_off, term_doc
+
+        # changes since the base was built
+        self._removed: set[int] = set()
+        self._extra: list[tuple[str, int]] = []
+        self._extra_docs: dict[int, tuple[str, str]] = {}
+
+    def __len__(self):
+        return len(self._doc_id) - len(self._removed) + len(self._extra_docs)
+
+    def nbytes(self) -> int:
+        """Memory held by the base arrays (the overlay is small and short-lived)."""
+        return sum(sys.getsizeof(part) for part in (
+            self._doc_text, self._doc_off, self._doc_id, self._term_text, self._term_off, self._term_doc,
+        ))
+
+    def _term(self, i: int) -> str:
+        return self._term_text[self._term_off[i]:self._term_off[i + 1]]
+
+    def _doc(self, ordinal: int) -> tuple[str, str]:
+        return tuple(self._doc_text[self._doc_off[ordinal]:self._doc_off[ordinal + 1]].rsplit("\t", 1))
+
+    def _base_matches(self, prefix: str):
+        i = bisect.bisect_left(range(len(self._term_doc)), prefix, key=self._term)
+        while i < len(self._term_doc):
+            term = self._term(i)
+            if not term.startswith(prefix):
+                return
+            ordinal = self._term_doc[i]
+            pk = self._doc_id[ordinal]
+            if pk not in self._removed:
+                yield term, pk, ordinal
+            i += 1
+
+    def _extra_matches(self, prefix: str):
+        for term, pk in self._extra[bisect.bisect_left(self._extra, (prefix,)):]:
+            if not term.startswith(prefix):
+                return
+            yield term, pk, -1
+
+    def lookup(self, prefix: str, limit: int) -> list[dict]:
+        """Up to `limit` docs with a word sequence starting with `prefix`, alphabetical by matched term."""
+        words = normalize(prefix)
+        if not words:
+            return []
+        prefix = " ".join(words)[:self._chars]
+        seen, out = set(), []
+        for _, pk, ordinal in heapq.merge(self._base_matches(prefix), self._extra_matches(prefix)):
+            if pk in seen:
+                continue
+            seen.add(pk)
+            name, slug = self._doc(ordinal) if ordinal >= 0 else self._extra_docs[pk]
+            out.append({"id": pk, "name": name, "slug": slug})
+            if len(out) == limit:
+                break
+        return out
+
+    def apply(self, changed: set[int], rows) -> None:
+        """`changed` ids now look like `rows` (id, name, slug); ids missing from rows are gone."""
+        self._removed |= changed
+        self._extra = [e for e in self._extra if e[1] not in changed]
+        for pk in changed:
+            self._extra_docs.pop(pk, None)
+        for pk, name, slug in rows:
+            self._extra_docs[pk] = (name, slug)
+            self._extra.extend((term, pk) for term in terms_for(name, self._chars, self._max_words))
+        self._extra.sort()
+
+
+def pack(payload) -> bytes:
+    return zlib.compress(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL), 1)
+
+
+def unpack(blob: bytes):
+    return pickle.loads(zlib.decompress(blob))
+
+
+# ---- building -----------------------------------------------------------------------
+
+def shared_cache():
+    return caches[settings.SUGGEST_CACHE] if settings.SUGGEST_CACHE else None
+
+
+def category_index() -> PrefixIndex:
+    return PrefixIndex(Category.objects.order_by().values_list("id", "name", "slug"))
+
+
+def build_indexes(publish: bool = True) -> tuple[PrefixIndex, PrefixIndex, object]:
+    """
+    (products, categories, since) read from the database; changes after `since` are
+    replayed on top. Published to SUGGEST_CACHE when there is one and `publish`.
+    """
+    # taken before reading rows, and replays re-read an overlap, so nothing committed mid-build is missed
+    since = timezone.now()
+    products = PrefixIndex(
+        Product.objects.filter(is_active=True).order_by().values_list("id", "name", "slug").iterator(chunk_size=5000)
+    )
+    categories = category_index()
+    shared = shared_cache()
+    if publish and shared is not None:
+        shared.set(INDEX_KEY, pack((products, categories, since)), None)
+        shared.set(BUILT_KEY, since.isoformat(), None)
+    return products, categories, since
+
+
+# ---- per-worker copy --------------------------------------------------------------------
+
+class _Local:
+    products: PrefixIndex | None = None
+    categories: PrefixIndex | None = None
+    since = None              # changes after this (minus the overlap) get replayed onto `products`
+    published: str | None = None  # BUILT_KEY token of the shared base we hold
+    built_at = 0.0            # monotonic, when the base was installed
+    polled_at = 0.0
+    building = False
+
+
+_local = _Local()
+_build_lock = threading.Lock()
+
+
+def _install(products, categories, since, published=None) -> None:
+    _local.products, _local.categories, _local.since = products, categories, since
+    _local.published = published
+    _local.built_at = time.monotonic()
+    _local.polled_at = 0.0  # replay what changed during the build on the next request
+
+
+def _build() -> None:
+    try:
+        shared = shared_cache()
+        if shared is None:
+            _install(*build_indexes(publish=False))
+            return
+        token = shared.get(BUILT_KEY)
+        if token and token != _local.published and (blob := shared.get(INDEX_KEY)) is not None:
+            _install(*unpack(blob), published=token)
+            return
+        if shared.add(BUILD_LOCK_KEY, 1, settings.SUGGEST_BUILD_LOCK_TTL):
+            try:
+                products, categories, since = build_indexes()
+            finally:
+                shared.delete(BUILD_LOCK_KEY)
+            _install(products, categories, since, published=since.isoformat())
+        elif _local.products is None:
+            # another worker is publishing; don't sit on an empty index meanwhile
+            _install(*build_indexes(publish=False))
+    except Exception:
+        logger.exception("suggest index: build failed")
+    finally:
+        _local.building = False
+
+
+def _build_in_thread() -> None:
+    try:
+        _build()
+    finally:
+        connection.close()  # this thread's own connection
+
+
+def _start_build() -> None:
+    with _build_lock:
+        if _local.building:
+            return
+        _local.building = True
+    if settings.SUGGEST_BUILD_IN_BACKGROUND:
+        threading.Thread(target=_build_in_thread, name="suggest-index", daemon=True).start()
+    else:
+        _build()
+
+
+def _poll() -> None:
+    """Replay products changed since the base (plus an overlap: re-applying is idempotent)."""
+    _local.polled_at = time.monotonic()
+    products = _local.products
+    started = timezone.now()
+    since = _local.since - timedelta(seconds=settings.SUGGEST_POLL_OVERLAP)
+
+    limit = settings.SUGGEST_MAX_OVERLAY
+    rows = list(Product.objects.filter(updated_at__gt=since).order_by()
+                .values_list("id", "name", "slug", "is_active")[:limit + 1])
+    removed = set(ProductTombstone.objects.filter(removed_at__gt=since).values_list("product_id", flat=True)[:limit + 1])
+    overlay = len(rows) + len(removed) + len(products._removed)
+    if overlay > limit or time.monotonic() - _local.built_at > settings.SUGGEST_REBUILD_INTERVAL:
+        _start_build()
+    if len(rows) > limit or len(removed) > limit:
+        return  # a bulk change; wait for the rebuild rather than overlaying it
+
+    changed = {pk for pk, *_ in rows} | removed
+    if changed:
+        products.apply(changed, [(pk, name, slug) for pk, name, slug, active in rows if active and pk not in removed])
+    _local.categories = category_index()  # a few hundred rows, no change feed of their own
+    if _local.products is products:  # a rebuild may have been installed meanwhile, with its own `since`
+        _local.since = started
+
+    shared = shared_cache()
+    if shared is not None and shared.get(BUILT_KEY) not in (None, _local.published):
+        _start_build()  # someone published a newer base
+
+
+def suggest(prefix: str, limit: int) -> dict:
+    """{"products": [...], "categories": [...]}, each [{id, name, slug}], from this worker's index."""
+    if _local.products is None:
+        _start_build()
+        if _local.products is None:
+            return {"products": [], "categories": []}
+    elif time.monotonic() - _local.polled_at >= settings.SUGGEST_POLL_INTERVAL:
+        _poll()
+    return {
+        "products": _local.products.lookup(prefix, limit),
+        "categories": _local.categories.lookup(prefix, limit),
+    }
@@ -0,0 +1,70 @@
+from celery import shared_task
+from django.conf import settings
+
+from .models import Product
+from . import inventory, popularity
+from .snapshots import build_snapshots
+from .suggest import BUILD_LOCK_KEY, build_indexes, shared_cache
+from .images import build_variants, InvalidImage
+from .recommendations import rebuild_related_products, fold_order
+
+
+@shared_task
+def rebalance_stock_shards():
+    n = 0
+    for product in Product.objects.filter(sharded_stock=True).only("id", "name"):
+        inventory.rebalance(product)
+        n += 1
+    return n
+
+
+@shared_task
+def build_catalog_snapshots(full=False):
+    return build_snapshots(full=full)
+
+
+@shared_task
+def rebuild_suggest_index():
+    # without a shared cache each web worker rebuilds its own copy on SUGGEST_REBUILD_INTERVAL
+    shared = shared_cache()
+    if shared is None or not shared.add(BUILD_LOCK_KEY, 1, settings.SUGGEST_BUILD_LOCK_TTL):
+        return "skipped"
+    try:
+        products, categories, _ = build_indexes()
+        return {"products": len(products), "categories": len(categories)}
+    finally:
+        shared.delete(BUILD_LOCK_KEY)
+
+
+@shared_task
+def build_product_image_variants(product_id: int):
+    product = Product.objects.filter(pk=product_id).exclude(image="").first()
+    if product is None:
+        return "missing"
+    try:
+        build_variants(product)
+    except InvalidImage:
+        return "invalid"
+    return "ok"
+
+
+@shared_task
+def rebuild_related():
+    return rebuild_related_products()
+
+
+@shared_task
+def fold_order_into_related(order_id: int):
+    from orders.models import OrderItem
+    fold_order(OrderItem.objects.filter(order_id=order_id).values_list("product_id", flat=True))
+
+
+@shared_task
+def record_order_sales(order_id: int):
+    from orders.models import OrderItem
+    popularity.record_sales(OrderItem.objects.filter(order_id=order_id).values_list("product_id", "quantity"))
+
+
+@shared_task
+def renormalize_popularity():
+    return popularity.renormalize()
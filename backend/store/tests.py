@@ -1,3 +1,173 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from .fastpath import product_rows
+from . import suggest
+from .categories import move_category
+from .models import Category, Product
+from .serializers import ProductSerializer
+from .views_api import ProductViewSet
+
+
+class FastProductRowsTests(TestCase):
+    """store.fastpath must render byte-for-byte what ProductSerializer + JSONRenderer do."""
+
+    @classmethod
+    def setUpTestData(cls):
+        parent = Category.objects.create(name="Electronics")
+        child = Category.objects.create(name="Audio", parent=parent)
+        Product.objects.create(category=parent, name="Cable", price=Decimal("9.5"), stock=3)
+        Product.objects.create(category=child, name="Café Speaker – \"mini\"", price=Decimal("1999.99"),
+                               stock=0, image_url="https://img.example.com/s.jpg", description="line\nbreak")
+        Product.objects.create(category=child, name="Headphones", price=Decimal("0.01"), stock=7, image_variants={
+            "webp": {"320": "products/abc-320.webp", "640": "products/abc-640.webp"},
+            "jpeg": {"320": "products/abc-320.jpg", "640": "products/abc-640.jpg"},
+        })
+
+    def test_product_list_is_byte_identical(self):
+        products = ProductViewSet.queryset.all()
+        expected = JSONRenderer().render(ProductSerializer(products, many=True).data)
+        self.assertEqual(FastJSONRenderer().render(product_rows(products)), expected)
+
+    def test_empty_list(self):
+        products = Product.objects.none()
+        self.assertEqual(FastJSONRenderer().render(product_rows(products)),
+                         JSONRenderer().render(ProductSerializer(products, many=True).data))
+
+
+class ProductCursorPaginationTests(TestCase):
+    """Paging has to walk (-popularity, -id), not popularity plus an offset over ties."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name="Bulk")
+        Product.objects.bulk_create(
+            Product(category=category, name=f"P{i}", slug=f"p-{i}", price=Decimal("1.00"), stock=1,
+                    popularity=5.0 if i % 100 == 0 else 0.0)
+            for i in range(1132)
+        )
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            data = self.client.get(url).json()
+            ids += [p["id"] for p in data["results"]]
+            pages += 1
+            self.assertLess(pages, 20)
+            url, last = data["next"], data
+        return ids, pages, last
+
+    def test_popular_pages_through_more_than_1000_ties(self):
+        ids, pages, last = self.walk("/api/products/?ordering=popular&page_size=100")
+        self.assertEqual(pages, 12)
+        self.assertEqual(len(ids), 1132)
+        self.assertEqual(len(set(ids)), 1132)
+        expected = list(Product.objects.order_by("-popularity", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+        # and back again from the last page
+        previous = self.client.get(last["previous"]).json()
+        self.assertEqual([p["id"] for p in previous["results"]], expected[1000:1100])
+
+    def test_newest_pages_through_everything(self):
+        ids, _, _ = self.walk("/api/products/?page_size=100")
+        self.assertEqual(ids, list(Product.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+
+    def test_invalid_cursor_is_404(self):
+        self.assertEqual(self.client.get("/api/products/?cursor=bm9wZQ").status_code, 404)
+
+
+@override_settings(SUGGEST_BUILD_IN_BACKGROUND=False, SUGGEST_POLL_INTERVAL=0)
+class SuggestIndexTests(TestCase):
+    """Edits reach a worker's index through the database change feed, not through signals or the cache."""
+
+    def setUp(self):
+        patcher = mock.patch.object(suggest, "_local", suggest._Local())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.category = Category.objects.create(name="Cables")
+        self.product = Product.objects.create(category=self.category, name="Usb C Cable", price=Decimal("5"), stock=1)
+
+    def names(self, prefix):
+        return [p["name"] for p in suggest.suggest(prefix, 8)["products"]]
+
+    def test_finds_any_word_start(self):
+        self.assertEqual(self.names("c cab"), ["Usb C Cable"])
+        self.assertEqual(suggest.suggest("cab", 8)["categories"][0]["name"], "Cables")
+
+    def test_edits_after_the_build_are_replayed(self):
+        self.assertEqual(self.names("usb"), ["Usb C Cable"])
+        self.product.name = "Lightning Cable"
+        self.product.save()
+        Product.objects.create(category=self.category, name="Usb Hub", price=Decimal("9"), stock=1)
+        self.assertEqual(self.names("usb"), ["Usb Hub"])
+        self.assertEqual(self.names("light"), ["Lightning Cable"])
+
+        self.product.is_active = False
+        self.product.save()
+        Product.objects.get(name="Usb Hub").delete()
+        self.assertEqual(self.names("usb") + self.names("light"), [])
+
+
+class CategoryTreeTests(TestCase):
+    """Materialized category paths: subtree filters, subtree moves and the cached tree."""
+
+    def setUp(self):
+        cache.clear()
+        self.electronics = Category.objects.create(name="Electronics")
+        self.audio = Category.objects.create(name="Audio", parent=self.electronics)
+        self.headphones = Category.objects.create(name="Headphones", parent=self.audio)
+        self.toys = Category.objects.create(name="Toys")
+        for category, name in ((self.electronics, "Charger"), (self.audio, "Speaker"),
+                               (self.headphones, "Earbuds"), (self.toys, "Kite")):
+            Product.objects.create(category=category, name=name, price=Decimal("10"), stock=1)
+
+    def names(self, category):
+        return sorted(p["name"] for p in self.client.get(f"/api/products/?category={category}").json())
+
+    def tree(self):
+        def walk(nodes):
+            return {n["slug"]: walk(n["children"]) for n in nodes}
+        return walk(self.client.get("/api/categories/tree/").json())
+
+    def test_category_filter_includes_descendants(self):
+        self.assertEqual(self.names("electronics"), ["Charger", "Earbuds", "Speaker"])
+        self.assertEqual(self.names("audio"), ["Earbuds", "Speaker"])
+        self.assertEqual(self.names("missing"), [])
+
+    def test_move_rewrites_the_subtree(self):
+        self.assertEqual(move_category(self.audio, self.toys), 2)
+        audio, headphones = Category.objects.get(pk=self.audio.pk), Category.objects.get(pk=self.headphones.pk)
+        self.assertEqual(audio.parent_id, self.toys.pk)
+        self.assertEqual(audio.path, f"{self.toys.path}{audio.pk:08d}/")
+        self.assertEqual(headphones.path, f"{audio.path}{headphones.pk:08d}/")
+        self.assertEqual(headphones.parent_id, audio.pk)
+        self.assertEqual(Category.objects.get(pk=self.electronics.pk).path, self.electronics.path)
+
+    def test_move_under_own_descendant_is_refused(self):
+        with self.assertRaises(ValueError):
+            move_category(self.electronics, self.headphones)
+        self.electronics.parent = self.headphones
+        with self.assertRaises(ValidationError):
+            self.electronics.clean()
+        self.assertEqual(Category.objects.get(pk=self.headphones.pk).path,
+                         f"{self.electronics.path}{self.audio.pk:08d}/{self.headphones.pk:08d}/")
+
+    def test_tree_and_filter_follow_a_move(self):
+        self.assertEqual(self.tree(), {"electronics": {"audio": {"headphones": {}}}, "toys": {}})
+        self.assertEqual(self.names("toys"), ["Kite"])
+        move_category(self.audio, self.toys)  # a queryset UPDATE: no post_save, only its own version bump
+        self.assertEqual(self.tree(), {"electronics": {}, "toys": {"audio": {"headphones": {}}}})
+        self.assertEqual(self.names("toys"), ["Earbuds", "Kite", "Speaker"])
+        self.assertEqual(self.names("electronics"), ["Charger"])
+
+    def test_saving_a_new_parent_moves_the_subtree(self):
+        self.audio.parent = self.toys
+        self.audio.save()
+        self.assertTrue(Category.objects.get(pk=self.headphones.pk).path.startswith(self.toys.path))
@@ -1,17 +1,56 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import HttpResponse
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.response import Response
 from .models import Category, Product
+from .inventory import stock_levels
+from .fastpath import PRODUCT_VALUES, product_rows, format_product_rows
+from .pagination import ProductCursorPagination
+from .snapshots import load_manifest
+from .categories import category_tree, subtree_path
+from .suggest import suggest as suggest_lookup
+from .changes import changes_since, InvalidCursor
 from .serializers import CategorySerializer, ProductSerializer
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CatalogCacheMixin:
+    # list/detail payloads get cached, with gzip/brotli variants, by api.middleware.ApiCompressionMiddleware
+    cached_actions = ("list", "retrieve", "related")
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, "action", None) in self.cached_actions:
+            response.cache_catalog = True
+        return response
+
+class CategoryViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all().order_by("name")
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    cached_actions = CatalogCacheMixin.cached_actions + ("tree",)
+
+    # GET /api/categories/tree/  -> nested [{id, name, slug, children: [...]}], pre-rendered per catalog version
+    @action(detail=False, methods=["get"])
+    def tree(self, request):
+        return HttpResponse(category_tree()["json"], content_type="application/json")
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Product.objects.filter(is_active=True).select_related("category").order_by("-created_at")
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = "slug"   # enable /products/<slug>/
+    pagination_class = ProductCursorPagination  # opt-in via ?cursor= / ?page_size=
+    orderings = {
+        "newest": ("-created_at", "-id"),
+        "popular": ("-popularity", "-id"),  # time-decayed sales, see store.popularity
+    }
+
+    def get_ordering(self):
+        return self.orderings.get(self.request.query_params.get("ordering"), self.orderings["newest"])
 
     # optional quick filters (category & q search)
     def get_queryset(self):
@@ -19,7 +58,93 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         category = self.request.query_params.get("category")
         q = self.request.query_params.get("q")
         if category:
-            qs = qs.filter(category__slug=category)
+            # the whole subtree: one prefix range on the category path index
+            path = subtree_path(category)
+            qs = qs.filter(category__path__startswith=path) if path else qs.none()
         if q:
             qs = qs.filter(name__icontains=q)
-        return qs
+        return qs.order_by(*self.get_ordering())
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        qs = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(qs.values(*PRODUCT_VALUES, "popularity"))
+        if page is not None:
+            return self.get_paginated_response(format_product_rows(page))
+        return Response(product_rows(qs))
+
+    # GET /api/products/<slug>/related/  -> "frequently bought together", precomputed top-K
+    @action(detail=True, methods=["get"])
+    def related(self, request, slug=None):
+        qs = (Product.objects.filter(is_active=True, related_to__product__slug=slug)
+              .select_related("category").order_by("related_to__rank"))
+        return Response(product_rows(qs[:settings.RELATED_PRODUCTS_TOP_K]))
+
+    # GET /api/products/suggest/?prefix=wire&limit=8  -> {"products": [...], "categories": [...]}
+    # from the in-process prefix index (store.suggest); at most one change-feed query per SUGGEST_POLL_INTERVAL
+    @action(detail=False, methods=["get"])
+    def suggest(self, request):
+        prefix = request.query_params.get("prefix", "").strip()
+        if not prefix:
+            return Response({"detail": "prefix query param required."}, status=400)
+        try:
+            limit = int(request.query_params.get("limit", settings.SUGGEST_LIMIT))
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=400)
+        limit = max(1, min(limit, settings.SUGGEST_MAX_LIMIT))
+        if len(prefix) < settings.SUGGEST_MIN_PREFIX:
+            return Response({"products": [], "categories": []})
+        return Response(suggest_lookup(prefix, limit))
+
+    # GET /api/products/changes/?since=<cursor>  -> products changed/removed since the cursor, oldest first
+    @action(detail=False, methods=["get"])
+    def changes(self, request):
+        try:
+            return Response(changes_since(request.query_params.get("since") or None))
+        except InvalidCursor as e:
+            return Response({"detail": str(e)}, status=400)
+
+    # GET /api/products/availability/?ids=1,2,3  (or ?slugs=a,b,c)
+    # stock only, so the heavy list/detail payloads can be cached much longer
+    @action(detail=False, methods=["get"])
+    def availability(self, request):
+        ids = [v for v in request.query_params.get("ids", "").split(",") if v.strip()]
+        slugs = [v.strip() for v in request.query_params.get("slugs", "").split(",") if v.strip()]
+        if not (ids or slugs):
+            return Response({"detail": "ids or slugs query param required."}, status=400)
+        if len(ids) + len(slugs) > settings.AVAILABILITY_MAX_ITEMS:
+            return Response({"detail": f"At most {settings.AVAILABILITY_MAX_ITEMS} products per request."}, status=400)
+        try:
+            ids = sorted({int(v) for v in ids})
+        except ValueError:
+            return Response({"detail": "ids must be integers."}, status=400)
+        slugs = sorted(set(slugs))
+
+        digest = hashlib.sha1(f"{ids}|{slugs}".encode()).hexdigest()
+        key = f"store:availability:{digest}"
+        data = cache.get(key)
+        if data is None:
+            qs = Product.objects.filter(is_active=True)
+            if ids and slugs:
+                qs = qs.filter(Q(id__in=ids) | Q(slug__in=slugs))
+            elif ids:
+                qs = qs.filter(id__in=ids)
+            else:
+                qs = qs.filter(slug__in=slugs)
+            levels = stock_levels(qs.order_by("id").values("id", "stock", "sharded_stock"))
+            data = [{"id": pid, "stock": stock, "in_stock": stock > 0} for pid, stock in levels.items()]
+            cache.set(key, data, settings.AVAILABILITY_CACHE_TTL)
+
+        resp = Response(data)
+        resp["Cache-Control"] = f"public, max-age={settings.AVAILABILITY_CACHE_TTL}"
+        return resp
+
+
+# GET /api/catalog/manifest/  -> which immutable snapshot files make up the current catalog
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def catalog_manifest(request):
+    resp = Response(load_manifest())
+    resp["Cache-Control"] = f"public, max-age={settings.CATALOG_SNAPSHOT_MANIFEST_TTL}"
+    return resp